@@ -1,14 +1,19 @@
-import PyPDF2
 import pdf2image
 import pytesseract
 import os
+import re
+import sys
 import tkinter as tk
 from tkinter import filedialog
 import pyttsx3
 import pygame
 import time
 import wave
-import struct
+import queue
+import hashlib
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 try:
     from colorama import init, Fore, Style
     from tqdm import tqdm
@@ -26,6 +31,61 @@ TESSERACT_PATH = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
 POPPLER_PATH = r"C:\Program Files\poppler\bin"
 AUDIO_BOOKS_DIR = r"C:\Users\sgins\Downloads\AI-Generated-Audio-Books"
 
+# OCR pipeline: pages are rasterized OCR_WINDOW_PAGES at a time and handed to
+# OCR_WORKERS Tesseract processes; at most OCR_MAX_PENDING_PAGES page images
+# exist at once.  Each Tesseract is limited to OCR_THREADS_PER_WORKER threads.
+OCR_DPI = 200
+OCR_LANG = 'eng'
+OCR_WORKERS = int(os.environ.get("PDF2MP3_OCR_WORKERS", str(os.cpu_count() or 1)))
+OCR_WINDOW_PAGES = int(os.environ.get("PDF2MP3_OCR_WINDOW_PAGES", "4"))
+OCR_MAX_PENDING_PAGES = int(os.environ.get("PDF2MP3_OCR_MAX_PENDING_PAGES", str(2 * OCR_WORKERS)))
+OCR_THREADS_PER_WORKER = 1
+
+# A page keeps its text layer when it has at least MIN_TEXT_LAYER_CHARS
+# non-blank characters, at least this share of them letters; else it is OCR'd.
+MIN_TEXT_LAYER_CHARS = 25
+MIN_TEXT_LAYER_LETTER_RATIO = 0.5
+
+# OCR results are cached per (PDF content, page, DPI, language, Tesseract version).
+# An empty PDF2MP3_OCR_CACHE_DIR disables the cache.
+OCR_CACHE_DIR = os.environ.get(
+    "PDF2MP3_OCR_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf2mp3", "ocr"))
+OCR_CACHE_MAX_MB = int(os.environ.get("PDF2MP3_OCR_CACHE_MAX_MB", "256"))
+
+# Run metrics, as --metrics/--profile in file-to-audio-converter.py: per-stage
+# timings go to PDF2MP3_METRICS_FILE (JSON for *.json, Prometheus text
+# otherwise); with PDF2MP3_PROFILE_DIR set, the slowest stage's cProfile stats
+# and tracemalloc snapshot are saved there.
+METRICS_FILE = os.environ.get("PDF2MP3_METRICS_FILE", "")
+PROFILE_DIR = os.environ.get("PDF2MP3_PROFILE_DIR", "")
+
+# Streaming playback: chunks are played as soon as they are synthesized.
+# Synthesis never waits for playback, so the full WAV is written as early as
+# without it.  PDF2MP3_STREAM_PLAYBACK=0 plays the file afterwards.
+STREAM_PLAYBACK = os.environ.get("PDF2MP3_STREAM_PLAYBACK", "1") != "0"
+
+def load_converter():
+    """
+    Import file-to-audio-converter.py (its file name is not a valid module
+    name) for the code both scripts share.  It sits next to this script when
+    deployed, and one directory up in the repository.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    for directory in (here, os.path.dirname(here)):
+        path = os.path.join(directory, "file-to-audio-converter.py")
+        if os.path.isfile(path):
+            spec = importlib.util.spec_from_file_location("file_to_audio_converter", path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = module
+            spec.loader.exec_module(module)
+            return module
+    raise ImportError(f"file-to-audio-converter.py not found next to {here} or in its parent directory")
+
+# Shared with the main converter: the PDF text-layer backends (PDF2MP3_PDF_BACKEND,
+# any backend registered there), chunk planning (PDF2MP3_CHUNK_CHARS) and metrics.
+converter = load_converter()
+
 # Configure Tesseract path
 if os.path.exists(TESSERACT_PATH):
     if colorama_available:
@@ -39,6 +99,34 @@ else:
     else:
         print(f"Tesseract not found at {TESSERACT_PATH}. Ensure it is installed.")
 
+class RunMetrics(converter.RunMetrics):
+    """
+    The converter's stage metrics.  The run's characters are those spoken and
+    its audio is the assembled WAV; segment_seconds holds the OCR time of
+    every recognized page.
+    """
+    TOTAL_CHARACTERS_STAGE = "synthesis"
+    TOTAL_AUDIO_STAGE = "assembly"
+    TIMINGS_KEY = "ocr_pages"
+    TIMINGS_METRIC = "pdf2mp3_ocr_page_seconds"
+    TIMINGS_HELP = "OCR time per recognized page."
+    PROFILE_PREFIX = "pdf2mp3-ocr-"
+
+run_metrics = RunMetrics(profile=bool(PROFILE_DIR))
+
+def plan_chunks(text, target_chars=None):
+    """
+    converter.plan_chunks() over the text's blank-line separated paragraphs.
+    OCR output breaks paragraphs far more often than a real document, so a
+    paragraph end gets a sentence pause rather than a paragraph pause.
+    """
+    paragraphs = [(paragraph.strip(), "paragraph") for paragraph in re.split(r"\n\s*\n", text)]
+    chunks = list(converter.plan_chunks(
+        paragraphs, converter.CHUNK_TARGET_CHARS if target_chars is None else target_chars))
+    return [chunk._replace(pause_after_ms=converter.CHUNK_SENTENCE_PAUSE_MS)
+            if i + 1 < len(chunks) and chunks[i + 1].source != chunk.source else chunk
+            for i, chunk in enumerate(chunks)]
+
 def select_pdf_file():
     """Select a PDF file using a dialog."""
     if colorama_available:
@@ -77,78 +165,84 @@ def select_pdf_file():
             print(f"Error with file dialog: {e}")
         return None
 
+def text_layer_usable(page_text):
+    """True if a page's text layer is worth keeping instead of OCR-ing the page."""
+    visible = "".join(page_text.split())
+    if len(visible) < MIN_TEXT_LAYER_CHARS:
+        return False
+    # Broken font encodings give long runs of symbols and replacement characters.
+    letters = sum(1 for char in visible if char.isalpha())
+    return letters / len(visible) >= MIN_TEXT_LAYER_LETTER_RATIO
+
 def extract_text_with_ocr(pdf_path, max_pages=999):
-    """Extract text from PDF using PyPDF2, fall back to OCR if needed."""
+    """Extract text page by page: keep usable text layers, OCR only the deficient pages."""
     if colorama_available:
         print(f"{Fore.YELLOW}📄 Starting text extraction from {pdf_path}...{Style.RESET_ALL}")
     else:
         print(f"Starting text extraction from {pdf_path}...")
     
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            num_pages = min(len(reader.pages), max_pages)
-            text = ""
+        # Callers that import this module may OCR several PDFs; report each one's own counts.
+        ocr_cache_stats.update(dict.fromkeys(ocr_cache_stats, 0))
+        backend = converter.get_pdf_backend(converter.PDF_BACKEND)
+        num_pages = min(backend.page_count(pdf_path), max_pages)
+        if colorama_available:
+            print(f"{Fore.CYAN}🔍 Extracting text from {num_pages} pages...{Style.RESET_ALL}")
+        else:
+            print(f"Extracting text from {num_pages} pages...")
+        
+        with run_metrics.stage("extract") as record:
+            page_texts = backend.extract_pages(pdf_path, 0, num_pages)
             if colorama_available:
-                print(f"{Fore.CYAN}🔍 Extracting text from {num_pages} pages...{Style.RESET_ALL}")
-            else:
-                print(f"Extracting text from {num_pages} pages...")
-            
-            page_range = tqdm(range(num_pages), desc="Processing pages", leave=True) if colorama_available else range(num_pages)
-            for page_num in page_range:
-                page = reader.pages[page_num]
-                page_text = page.extract_text() or ""
-                text += page_text
-            
-            if len(text.strip()) > 100:
-                if colorama_available:
-                    print(f"{Fore.GREEN}✓ Text extracted successfully without OCR (length: {len(text)} chars){Style.RESET_ALL}")
-                else:
-                    print(f"Text extracted successfully without OCR (length: {len(text)} chars)")
-                return text
-            
+                page_texts = tqdm(page_texts, total=num_pages, desc="Processing pages", leave=True)
+            page_texts = list(page_texts)
+            record["characters"] = sum(len(page_text) for page_text in page_texts)
+        ocr_page_numbers = [i + 1 for i, page_text in enumerate(page_texts) if not text_layer_usable(page_text)]
+        
+        if ocr_page_numbers:
             if colorama_available:
-                print(f"{Fore.YELLOW}⚠ Minimal text detected, attempting OCR...{Style.RESET_ALL}")
+                print(f"{Fore.YELLOW}⚠ {len(ocr_page_numbers)} of {num_pages} pages lack a usable text layer, "
+                      f"running OCR on them ({OCR_WORKERS} workers)...{Style.RESET_ALL}")
             else:
-                print("Minimal text detected, attempting OCR...")
+                print(f"{len(ocr_page_numbers)} of {num_pages} pages lack a usable text layer, "
+                      f"running OCR on them ({OCR_WORKERS} workers)...")
             try:
-                images = convert_from_path(
-                    pdf_path,
-                    first_page=1,
-                    last_page=num_pages,
-                    poppler_path=POPPLER_PATH if os.path.exists(POPPLER_PATH) else None
-                )
-                ocr_text = ""
-                if colorama_available:
-                    print(f"{Fore.CYAN}🖼 Processing {len(images)} pages with OCR...{Style.RESET_ALL}")
-                else:
-                    print(f"Processing {len(images)} pages with OCR...")
-                
-                for i, image in enumerate(tqdm(images, desc="OCR Progress", leave=True) if colorama_available else images):
-                    if colorama_available:
-                        print(f"{Fore.CYAN}🔎 OCR processing page {i+1}...{Style.RESET_ALL}")
-                    else:
-                        print(f"Processing page {i+1} with OCR...")
-                    ocr_text += pytesseract.image_to_string(image, lang='eng')
-                if ocr_text.strip():
-                    if colorama_available:
-                        print(f"{Fore.GREEN}✓ OCR completed successfully (length: {len(ocr_text)} chars){Style.RESET_ALL}")
-                    else:
-                        print(f"OCR completed successfully (length: {len(ocr_text)} chars)")
-                    return ocr_text.strip()
-                else:
-                    if colorama_available:
-                        print(f"{Fore.RED}✗ OCR extracted no text.{Style.RESET_ALL}")
-                    else:
-                        print("OCR extracted no text.")
-                    return None
+                with run_metrics.stage("ocr") as record:
+                    for page_num, ocr_text in ocr_pages_cached(pdf_path, ocr_page_numbers).items():
+                        record["characters"] += len(ocr_text)
+                        if ocr_text.strip():
+                            page_texts[page_num - 1] = ocr_text
             except Exception as e:
                 if colorama_available:
-                    print(f"{Fore.RED}✗ OCR failed: {e}{Style.RESET_ALL}")
+                    print(f"{Fore.RED}✗ OCR failed, keeping the text layer for those pages: {e}{Style.RESET_ALL}")
                 else:
-                    print(f"OCR failed: {e}")
-                return None
-    
+                    print(f"OCR failed, keeping the text layer for those pages: {e}")
+        
+        text = "".join(page_texts)
+        text_layer_pages = num_pages - len(ocr_page_numbers)
+        if colorama_available:
+            print(f"{Fore.CYAN}📊 Pages from text layer: {text_layer_pages}, pages via OCR: {len(ocr_page_numbers)}{Style.RESET_ALL}")
+        else:
+            print(f"Pages from text layer: {text_layer_pages}, pages via OCR: {len(ocr_page_numbers)}")
+        if ocr_page_numbers and OCR_CACHE_DIR:
+            cache_summary = (f"OCR cache: {ocr_cache_stats['hits']} hits, {ocr_cache_stats['misses']} misses, "
+                             f"{ocr_cache_stats['evicted']} evicted")
+            if colorama_available:
+                print(f"{Fore.CYAN}🗄 {cache_summary}{Style.RESET_ALL}")
+            else:
+                print(cache_summary)
+        if text.strip():
+            if colorama_available:
+                print(f"{Fore.GREEN}✓ Text extracted successfully (length: {len(text)} chars){Style.RESET_ALL}")
+            else:
+                print(f"Text extracted successfully (length: {len(text)} chars)")
+            return text.strip()
+        if colorama_available:
+            print(f"{Fore.RED}✗ No text could be extracted, even with OCR.{Style.RESET_ALL}")
+        else:
+            print("No text could be extracted, even with OCR.")
+        return None
+
     except Exception as e:
         if colorama_available:
             print(f"{Fore.RED}✗ Error processing PDF: {e}{Style.RESET_ALL}")
@@ -156,53 +250,199 @@ def extract_text_with_ocr(pdf_path, max_pages=999):
             print(f"Error processing PDF: {e}")
         return None
 
+def page_windows(page_numbers, window):
+    """Group sorted 1-based page numbers into contiguous (first, last) runs of at most window pages."""
+    run = []
+    for page_num in page_numbers:
+        if run and (page_num != run[-1] + 1 or len(run) == window):
+            yield run[0], run[-1]
+            run = []
+        run.append(page_num)
+    if run:
+        yield run[0], run[-1]
+
+def _ocr_image(image):
+    started = time.perf_counter()
+    try:
+        return pytesseract.image_to_string(image, lang=OCR_LANG)
+    finally:
+        image.close()
+        run_metrics.segment_seconds.append(time.perf_counter() - started)
+
+def ocr_pages(pdf_path, page_numbers, workers=OCR_WORKERS, window=OCR_WINDOW_PAGES):
+    """OCR the given 1-based pages with bounded memory; return {page_number: text}."""
+    # Tesseract's OpenMP would otherwise start one thread per core in every worker.
+    os.environ.setdefault("OMP_THREAD_LIMIT", str(OCR_THREADS_PER_WORKER))
+    # Each pending page holds a slot until its OCR finishes, which bounds the
+    # queue of rasterized images between Poppler and the Tesseract workers.
+    slots = threading.Semaphore(max(window, OCR_MAX_PENDING_PAGES))
+    progress = tqdm(total=len(page_numbers), desc="OCR Progress", leave=True) if colorama_available else None
+
+    def page_done(_future):
+        slots.release()
+        if progress is not None:
+            progress.update(1)
+
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for first_page, last_page in page_windows(sorted(page_numbers), window):
+            requested = last_page - first_page + 1
+            for _ in range(requested):
+                slots.acquire()
+            images = pdf2image.convert_from_path(
+                pdf_path,
+                dpi=OCR_DPI,
+                first_page=first_page,
+                last_page=last_page,
+                poppler_path=POPPLER_PATH if os.path.exists(POPPLER_PATH) else None
+            )
+            for _ in range(requested - len(images)):
+                slots.release()
+            for offset, image in enumerate(images):
+                future = pool.submit(_ocr_image, image)
+                future.add_done_callback(page_done)
+                futures[first_page + offset] = future
+            del images
+    if progress is not None:
+        progress.close()
+    return {page_num: future.result() for page_num, future in sorted(futures.items())}
+
+# Counts for the current extract_text_with_ocr() call, which resets them.
+ocr_cache_stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+def file_sha256(path):
+    """Hash a file's content in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def ocr_cache_key(pdf_hash, page_num, dpi, lang, tesseract_version):
+    parts = (pdf_hash, str(page_num), str(dpi), lang, tesseract_version)
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+def ocr_cache_path(key):
+    return os.path.join(OCR_CACHE_DIR, key[:2], key + ".txt")
+
+def ocr_cache_get(key):
+    """Return the cached OCR text for key (marking it recently used), or None."""
+    path = ocr_cache_path(key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except OSError:
+        ocr_cache_stats["misses"] += 1
+        return None
+    os.utime(path)
+    ocr_cache_stats["hits"] += 1
+    return text
+
+def ocr_cache_put(key, text):
+    path = ocr_cache_path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{os.getpid()}.part"
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(partial, path)
+
+def prune_ocr_cache(max_bytes):
+    """Evict least recently used OCR pages until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(OCR_CACHE_DIR):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            ocr_cache_stats["evicted"] += 1
+        except OSError:
+            pass
+
+def ocr_pages_cached(pdf_path, page_numbers):
+    """ocr_pages() that serves already-recognized pages from the OCR cache."""
+    if not OCR_CACHE_DIR:
+        return ocr_pages(pdf_path, page_numbers)
+    pdf_hash = file_sha256(pdf_path)
+    version = str(pytesseract.get_tesseract_version())
+    keys = {page_num: ocr_cache_key(pdf_hash, page_num, OCR_DPI, OCR_LANG, version) for page_num in page_numbers}
+    results = {}
+    for page_num, key in keys.items():
+        cached = ocr_cache_get(key)
+        if cached is not None:
+            results[page_num] = cached
+    missing = [page_num for page_num in page_numbers if page_num not in results]
+    if missing:
+        for page_num, text in ocr_pages(pdf_path, missing).items():
+            ocr_cache_put(keys[page_num], text)
+            results[page_num] = text
+        prune_ocr_cache(OCR_CACHE_MAX_MB * 1024 * 1024)
+    return dict(sorted(results.items()))
+
 def count_words(text):
     """Count non-empty words in text."""
     words = [word for word in text.split() if word.strip()]
     return len(words)
 
-def add_silence_to_wav(input_wav, output_wav, silence_duration=2):
-    """Add silence to the start of a WAV file."""
+def wav_duration_seconds(path):
+    """Length of a WAV file in seconds, 0.0 if it cannot be read."""
     try:
-        with wave.open(input_wav, 'rb') as wav_in:
+        with wave.open(path, 'rb') as wav_in:
+            return wav_in.getnframes() / wav_in.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return 0.0
+
+def assemble_chunk_wavs(chunk_wavs, output_wav, silence_duration=2):
+    """Write silence_duration seconds of silence, then every (wav_file, Chunk) followed by its pause."""
+    try:
+        with wave.open(chunk_wavs[0][0], 'rb') as wav_in:
             channels = wav_in.getnchannels()
             sample_width = wav_in.getsampwidth()
             framerate = wav_in.getframerate()
-            n_frames = wav_in.getnframes()
-            audio_data = wav_in.readframes(n_frames)
-            
-            silence_frames = int(framerate * silence_duration)
-            silence_data = struct.pack('<' + str(channels * silence_frames) + 'h', *([0] * channels * silence_frames))
-            
-            with wave.open(output_wav, 'wb') as wav_out:
-                wav_out.setnchannels(channels)
-                wav_out.setsampwidth(sample_width)
-                wav_out.setframerate(framerate)
-                wav_out.writeframes(silence_data)
-                wav_out.writeframes(audio_data)
-                
+        silence_frame = b"\x00" * sample_width * channels
+
+        with wave.open(output_wav, 'wb') as wav_out:
+            wav_out.setnchannels(channels)
+            wav_out.setsampwidth(sample_width)
+            wav_out.setframerate(framerate)
+            wav_out.writeframes(silence_frame * int(framerate * silence_duration))
+            for wav_file, chunk in chunk_wavs:
+                with wave.open(wav_file, 'rb') as wav_in:
+                    wav_out.writeframes(wav_in.readframes(wav_in.getnframes()))
+                wav_out.writeframes(silence_frame * int(framerate * chunk.pause_after_ms / 1000))
         return True
     except Exception as e:
         if colorama_available:
-            print(f"{Fore.RED}✗ Error adding silence to WAV: {e}{Style.RESET_ALL}")
+            print(f"{Fore.RED}✗ Error assembling WAV: {e}{Style.RESET_ALL}")
         else:
-            print(f"Error adding silence to WAV: {e}")
+            print(f"Error assembling WAV: {e}")
         return False
 
-def text_to_speech(text, temp_file, output_file):
-    """Convert text to WAV using pyttsx3 with a male voice."""
+def text_to_speech(text, temp_file, output_file, stream_playback=STREAM_PLAYBACK):
+    """
+    Convert text to WAV using pyttsx3 with a male voice.  The text is spoken
+    in plan_chunks() chunks, each saved next to temp_file, then assembled.
+    With stream_playback each chunk is played as soon as it is saved, and
+    this returns once playback has finished.
+    """
     if colorama_available:
         print(f"{Fore.YELLOW}🎙 Starting text-to-speech conversion...{Style.RESET_ALL}")
     else:
         print("Starting text-to-speech conversion...")
+    started = time.perf_counter()
+    player = None
     try:
-        if os.path.exists(temp_file):
-            if colorama_available:
-                print(f"{Fore.YELLOW}🗑 Deleting existing temp WAV file: {temp_file}{Style.RESET_ALL}")
-            else:
-                print(f"Deleting existing temp WAV file: {temp_file}")
-            os.remove(temp_file)
-        
         engine = pyttsx3.init()
         voices = engine.getProperty('voices')
         selected_voice = None
@@ -238,35 +478,137 @@ def text_to_speech(text, temp_file, output_file):
         engine.setProperty('rate', 150)
         engine.setProperty('volume', 0.9)
         
-        engine.save_to_file(text, temp_file)
-        engine.runAndWait()
-        
-        if os.path.exists(temp_file):
-            if add_silence_to_wav(temp_file, output_file):
-                if colorama_available:
-                    print(f"{Fore.GREEN}✓ WAV file with silence saved as: {output_file}{Style.RESET_ALL}")
-                else:
-                    print(f"WAV file with silence saved as: {output_file}")
-                os.remove(temp_file)
-                return True
-            else:
-                if colorama_available:
-                    print(f"{Fore.RED}✗ Failed to add silence to WAV file: {output_file}{Style.RESET_ALL}")
-                else:
-                    print(f"Failed to add silence to WAV file: {output_file}")
-                return False
+        chunks = plan_chunks(text)
+        chunk_wavs = []
+        if colorama_available:
+            print(f"{Fore.CYAN}🧩 Speaking {len(chunks)} chunks of up to {converter.CHUNK_TARGET_CHARS} characters{Style.RESET_ALL}")
         else:
+            print(f"Speaking {len(chunks)} chunks of up to {converter.CHUNK_TARGET_CHARS} characters")
+        if stream_playback:
+            player = StreamingPlayer()
+            player.start()
+        with run_metrics.stage("synthesis", characters=len(text)) as record:
+            progress = tqdm(chunks, desc="Synthesizing", leave=True) if colorama_available else chunks
+            for n, chunk in enumerate(progress):
+                chunk_file = f"{os.path.splitext(temp_file)[0]}_{n}.wav"
+                engine.save_to_file(chunk.text, chunk_file)
+                engine.runAndWait()
+                if not os.path.exists(chunk_file):
+                    if colorama_available:
+                        print(f"{Fore.RED}✗ Failed to create temporary WAV file: {chunk_file}{Style.RESET_ALL}")
+                    else:
+                        print(f"Failed to create temporary WAV file: {chunk_file}")
+                    return False
+                chunk_wavs.append((chunk_file, chunk))
+                if player is not None:
+                    player.add(chunk_file, chunk.pause_after_ms)
+            record["audio_seconds"] = sum(wav_duration_seconds(chunk_file) for chunk_file, _ in chunk_wavs)
+        if not chunk_wavs:
             if colorama_available:
-                print(f"{Fore.RED}✗ Failed to create temporary WAV file: {temp_file}{Style.RESET_ALL}")
+                print(f"{Fore.RED}✗ No text to speak.{Style.RESET_ALL}")
             else:
-                print(f"Failed to create temporary WAV file: {temp_file}")
+                print("No text to speak.")
             return False
+        
+        with run_metrics.stage("assembly") as record:
+            assembled = assemble_chunk_wavs(chunk_wavs, output_file)
+            record["audio_seconds"] = wav_duration_seconds(output_file) if assembled else 0.0
+        if not assembled:
+            if colorama_available:
+                print(f"{Fore.RED}✗ Failed to assemble WAV file: {output_file}{Style.RESET_ALL}")
+            else:
+                print(f"Failed to assemble WAV file: {output_file}")
+            return False
+        if colorama_available:
+            print(f"{Fore.GREEN}✓ WAV file with silence saved as: {output_file}{Style.RESET_ALL}")
+        else:
+            print(f"WAV file with silence saved as: {output_file}")
+        if player is not None:
+            player.finish()
+            if player.first_audio is not None:
+                first_audio = f"Playback started {player.first_audio - started:.1f}s after synthesis began"
+                if colorama_available:
+                    print(f"{Fore.CYAN}⏱ {first_audio}{Style.RESET_ALL}")
+                else:
+                    print(first_audio)
+        with run_metrics.stage("cleanup"):
+            for chunk_file, _ in chunk_wavs:
+                os.remove(chunk_file)
+        return True
     except Exception as e:
         if colorama_available:
             print(f"{Fore.RED}✗ Error generating WAV: {e}{Style.RESET_ALL}")
         else:
             print(f"Error generating WAV: {e}")
         return False
+    finally:
+        if player is not None and player.is_alive():
+            player.abort()  # an error or Ctrl-C: stop now rather than play out the queue
+
+class StreamingPlayer(threading.Thread):
+    """
+    Plays chunk WAVs through one pygame mixer channel as they are added, each
+    followed by its pause.  Channel.queue() lines the next sound up behind the
+    one playing, so chunks join without gaps.  add() never blocks; only file
+    names wait in the queue, and a chunk is decoded just before the channel
+    has room for it, so at most a few Sounds are in memory at once.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.pending = queue.Queue()
+        self.stopped = threading.Event()
+        self.first_audio = None  # perf_counter() when the first chunk started
+
+    def add(self, wav_file, pause_ms):
+        self.pending.put((wav_file, pause_ms))
+
+    def finish(self):
+        """Wait until everything added so far has been played."""
+        self.pending.put(None)
+        self.join()
+
+    def abort(self):
+        """Stop playback and drop the queued chunks, without waiting."""
+        self.stopped.set()
+        self.pending.put(None)
+
+    def _enqueue(self, channel, sound):
+        if not channel.get_busy():
+            channel.play(sound)
+            return
+        while channel.get_queue() is not None:
+            if self.stopped.is_set():
+                return
+            time.sleep(0.01)
+        channel.queue(sound)
+
+    def run(self):
+        try:
+            pygame.mixer.init()
+            frequency, size, channels = pygame.mixer.get_init()
+            frame_bytes = abs(size) // 8 * channels
+            channel = pygame.mixer.Channel(0)
+            while not self.stopped.is_set():
+                item = self.pending.get()
+                if item is None or self.stopped.is_set():
+                    break
+                wav_file, pause_ms = item
+                self._enqueue(channel, pygame.mixer.Sound(wav_file))
+                if self.first_audio is None:
+                    self.first_audio = time.perf_counter()
+                if pause_ms:
+                    silence = bytes(int(frequency * pause_ms / 1000) * frame_bytes)
+                    self._enqueue(channel, pygame.mixer.Sound(buffer=silence))
+            while channel.get_busy() and not self.stopped.is_set():
+                time.sleep(0.05)
+            if self.stopped.is_set():
+                channel.stop()
+        except Exception as e:
+            if colorama_available:
+                print(f"{Fore.RED}✗ Error playing audio: {e}{Style.RESET_ALL}")
+            else:
+                print(f"Error playing audio: {e}")
 
 def play_audio(file_path):
     """Play WAV file using pygame."""
@@ -310,8 +652,9 @@ def main():
         output_file = os.path.join(AUDIO_BOOKS_DIR, output_base)
         
         if text_to_speech(text, temp_file, output_file):
-            time.sleep(2)
-            play_audio(output_file)
+            if not STREAM_PLAYBACK:
+                time.sleep(2)
+                play_audio(output_file)
             if colorama_available:
                 print(f"{Fore.GREEN}✅ Conversion and playback completed successfully!{Style.RESET_ALL}")
             else:
@@ -328,4 +671,11 @@ def main():
             print("No text extracted from PDF. Exiting.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        if METRICS_FILE:
+            run_metrics.write(METRICS_FILE)
+            print(f"Run metrics written to {METRICS_FILE}")
+        if PROFILE_DIR:
+            run_metrics.dump_profile(PROFILE_DIR)
\ No newline at end of file
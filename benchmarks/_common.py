@@ -0,0 +1,56 @@
+"""Shared helpers for the benchmark scripts in this directory."""
+import os
+import sys
+import math
+import wave
+import array
+import importlib.util
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONVERTER_PATH = os.path.join(REPO_ROOT, "file-to-audio-converter.py")
+
+
+def load_converter(path=CONVERTER_PATH, name="file_to_audio_converter"):
+    """Import file-to-audio-converter.py (its file name is not a valid module name)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so worker processes can unpickle functions defined in it.
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unavailable."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux.
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def write_tone_wav(path, seconds, framerate=22050, frequency=440.0, amplitude=0.3):
+    """Write a mono 16-bit sine tone, the same format pyttsx3 typically produces."""
+    period = max(1, int(round(framerate / frequency)))
+    one_period = array.array("h", (
+        int(amplitude * 32767 * math.sin(2 * math.pi * n / period)) for n in range(period)
+    ))
+    total = int(seconds * framerate)
+    samples = one_period * (total // period + 1)
+    del samples[total:]
+    if sys.byteorder == "big":
+        samples.byteswap()
+    with wave.open(path, "wb") as wav_out:
+        wav_out.setnchannels(1)
+        wav_out.setsampwidth(2)
+        wav_out.setframerate(framerate)
+        wav_out.writeframes(samples.tobytes())
+    return path
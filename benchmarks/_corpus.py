@@ -0,0 +1,153 @@
+"""
+Synthetic TXT, DOCX and PDF documents for the benchmarks.
+
+The same deterministic text is written in each format: every page holds a
+short heading, a handful of paragraphs and the occasional list item, about
+1,800 characters in all.  DOCX and PDF files are assembled by hand so that
+generating a corpus needs nothing beyond the standard library.
+"""
+import os
+import random
+import zipfile
+import textwrap
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but "
+    "have an they you were her she there been one all we their has would when what will more if no "
+    "out so said can who up some time into them could new two may then first any like now my such "
+    "make over our even most me state after also made many did must before back see through way "
+    "where get much go well your know should down work year because come people just say each those "
+    "take day good how long very here between both life being under never system same another while "
+    "last might great old off come since against right place around however home small found thought "
+    "chapter engine voice reader signal archive measure pattern station harbour lantern"
+).split()
+
+PARAGRAPHS_PER_PAGE = 6
+
+
+def page_blocks(page_number):
+    """[(kind, text)] for one page; kind is "heading", "paragraph" or "list"."""
+    rng = random.Random(page_number)
+    blocks = [("heading", f"Chapter {page_number // 10 + 1}, part {page_number % 10 + 1}")]
+    for paragraph in range(PARAGRAPHS_PER_PAGE):
+        if paragraph == 3 and page_number % 3 == 0:
+            blocks.append(("list", "- " + " ".join(rng.choice(WORDS) for _ in range(12)) + "."))
+        sentences = []
+        for _ in range(rng.randint(4, 6)):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 16)))
+            sentences.append(sentence.capitalize() + ".")
+        blocks.append(("paragraph", " ".join(sentences)))
+    return blocks
+
+
+def write_txt(path, pages):
+    with open(path, "w", encoding="utf-8") as f:
+        for page_number in range(pages):
+            for _, text in page_blocks(page_number):
+                f.write(text + "\n\n")
+    return path
+
+
+DOCX_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>"""
+
+DOCX_PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCX_DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+DOCX_STYLES = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="{W_NAMESPACE}">
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="ListParagraph"><w:name w:val="List Paragraph"/><w:basedOn w:val="Normal"/></w:style>
+</w:styles>"""
+
+DOCX_STYLE_IDS = {"heading": "Heading1", "list": "ListParagraph"}
+
+
+def write_docx(path, pages):
+    body = []
+    for page_number in range(pages):
+        blocks = page_blocks(page_number)
+        for index, (kind, text) in enumerate(blocks):
+            properties = ""
+            if kind in DOCX_STYLE_IDS:
+                properties = f'<w:pPr><w:pStyle w:val="{DOCX_STYLE_IDS[kind]}"/></w:pPr>'
+            page_break = '<w:r><w:br w:type="page"/></w:r>' if index == len(blocks) - 1 else ""
+            body.append(f"<w:p>{properties}<w:r><w:t>{escape(text)}</w:t></w:r>{page_break}</w:p>")
+    document = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                f'<w:document xmlns:w="{W_NAMESPACE}"><w:body>{"".join(body)}<w:sectPr/></w:body></w:document>')
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        package.writestr("_rels/.rels", DOCX_PACKAGE_RELS)
+        package.writestr("word/_rels/document.xml.rels", DOCX_DOCUMENT_RELS)
+        package.writestr("word/styles.xml", DOCX_STYLES)
+        package.writestr("word/document.xml", document)
+    return path
+
+
+def _pdf_string(text):
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def _pdf_page_content(page_number):
+    lines = ["BT", "/F1 10 Tf", "13 TL", "56 780 Td"]
+    for _, text in page_blocks(page_number):
+        for line in textwrap.wrap(text, 95):
+            lines.append(f"{_pdf_string(line)} Tj T*")
+        lines.append("T*")
+    lines.append("ET")
+    return "\n".join(lines).encode("latin-1")
+
+
+def write_pdf(path, pages):
+    """A minimal PDF 1.4 file: one Helvetica text stream per A4 page."""
+    first_page_object = 4
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Count %d /Kids [%s] >>" % (
+            pages, " ".join(f"{first_page_object + 2 * n} 0 R" for n in range(pages)))).encode("ascii"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for page_number in range(pages):
+        content_object = first_page_object + 2 * page_number + 1
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                        "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_object).encode("ascii"))
+        stream = _pdf_page_content(page_number)
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref_offset = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset))
+    return path
+
+
+WRITERS = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def write_document(directory, file_format, pages):
+    """Write corpus_<pages>p.<format> into directory and return its path."""
+    path = os.path.join(directory, f"corpus_{pages}p.{file_format}")
+    return WRITERS[file_format](path, pages)
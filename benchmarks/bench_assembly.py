@@ -0,0 +1,107 @@
+"""
+Benchmark: time and peak RSS of audio assembly against segment count.
+
+Compares the old AudioSegment `+=` stitching loop with the streaming
+assemble_wav() in file-to-audio-converter.py.  Every (case, count) pair runs
+in a fresh interpreter so that the peak RSS figures do not bleed into each
+other.
+
+    python benchmarks/bench_assembly.py --segments 10 100 1000 --seconds 5
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from _common import load_converter, peak_rss_mb, write_tone_wav
+
+SEGMENT_TYPES = ["heading", "paragraph", "paragraph", "list", "paragraph"]
+
+
+def make_segments(converter, directory, count, seconds):
+    """[(wav_file, Chunk)] for count one-chunk segments of mixed types."""
+    chunks = converter.plan_chunks([("x", SEGMENT_TYPES[i % len(SEGMENT_TYPES)]) for i in range(count)])
+    segments = []
+    for i, chunk in enumerate(chunks):
+        wav_file = os.path.join(directory, f"segment_{i}.wav")
+        write_tone_wav(wav_file, seconds, frequency=220.0 + (i % 7) * 40)
+        segments.append((wav_file, chunk))
+    return segments
+
+
+def assemble_with_pydub(converter, temp_wav_files, output_wav):
+    """The stitching loop convert_text_to_audio() used before streaming assembly."""
+    AudioSegment = converter.load_pydub()
+    combined_audio = AudioSegment.empty()
+    for wav_file, chunk in temp_wav_files:
+        if chunk.pause_before_ms:
+            combined_audio += AudioSegment.silent(duration=chunk.pause_before_ms)
+        combined_audio += AudioSegment.from_wav(wav_file)
+        if chunk.pause_after_ms:
+            combined_audio += AudioSegment.silent(duration=chunk.pause_after_ms)
+    combined_audio.export(output_wav, format="wav")
+
+
+def run_case(case, directory, count, seconds):
+    converter = load_converter()
+    segments = make_segments(converter, directory, count, seconds)
+    output_wav = os.path.join(directory, "combined.wav")
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    if case == "pydub":
+        assemble_with_pydub(converter, segments, output_wav)
+    else:
+        converter.assemble_wav(segments, output_wav)
+    elapsed = time.perf_counter() - start
+    return {
+        "case": case,
+        "segments": count,
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "baseline_rss_mb": baseline_rss,
+        "output_mb": round(os.path.getsize(output_wav) / (1024 * 1024), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each synthetic segment")
+    parser.add_argument("--cases", nargs="+", default=["pydub", "streaming"], choices=["pydub", "streaming"])
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        directory = tempfile.mkdtemp(prefix="bench_assembly_")
+        try:
+            print(json.dumps(run_case(args.run_case, directory, args.segments[0], args.seconds)))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        return
+
+    results = []
+    print(f"{'case':<10} {'segments':>8} {'seconds':>9} {'peak RSS MB':>12} {'output MB':>10}")
+    for count in args.segments:
+        for case in args.cases:
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-case", case,
+                 "--segments", str(count), "--seconds", str(args.seconds)],
+                check=True, stdout=subprocess.PIPE, text=True,
+            )
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            rss = result["peak_rss_mb"]
+            print(f"{case:<10} {count:>8} {result['seconds']:>9.2f} "
+                  f"{rss if rss is None else round(rss, 1):>12} {result['output_mb']:>10}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: the old per-rule str.replace loop against the compiled
+single-pass lexicon in file-to-audio-converter.py, at 10, 1k and 10k rules.
+
+    python benchmarks/bench_lexicon.py --rules 10 1000 10000 --words 50000
+"""
+import json
+import time
+import random
+import string
+import argparse
+
+from _common import load_converter
+
+
+def legacy_preprocess(text, replacements):
+    """preprocess_text_for_tts() as it was: one full scan per rule."""
+    for original, replacement in replacements.items():
+        text = text.replace(original, replacement)
+    return text
+
+
+def make_rules(count, rng):
+    rules = {}
+    while len(rules) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10)))
+        rules[word] = word[:2] + "-" + word[2:] + ","
+    return rules
+
+
+def make_text(word_count, rules, rng, hit_ratio=0.05):
+    vocabulary = list(rules)
+    filler = ["the", "of", "and", "to", "in", "a", "is", "that", "for", "it", "as", "was", "with"]
+    words = [rng.choice(vocabulary) if rng.random() < hit_ratio else rng.choice(filler)
+             for _ in range(word_count)]
+    return " ".join(words)
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--words", type=int, default=50000, help="words of synthetic segment text")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    converter = load_converter()
+    rng = random.Random(1234)
+    results = []
+    print(f"{'rules':>6} {'compile s':>10} {'compiled s':>11} {'legacy s':>10} {'speed-up':>9}")
+    for count in args.rules:
+        rules = make_rules(count, rng)
+        text = make_text(args.words, rules, rng)
+        start = time.perf_counter()
+        lexicon = converter.compile_lexicon(rules)
+        compile_seconds = time.perf_counter() - start
+        compiled = best_of(args.repeat, converter.preprocess_text_for_tts, text, lexicon)
+        legacy = best_of(args.repeat, legacy_preprocess, text, rules)
+        results.append({"rules": count, "words": args.words, "compile_seconds": compile_seconds,
+                        "compiled_seconds": compiled, "legacy_seconds": legacy})
+        print(f"{count:>6} {compile_seconds:>10.4f} {compiled:>11.4f} {legacy:>10.4f} {legacy / compiled:>8.1f}x")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
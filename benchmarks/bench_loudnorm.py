@@ -0,0 +1,106 @@
+"""
+Benchmark: wall time of loudness normalization strategies on a synthetic book.
+
+  single-pass      assemble WAV, FFmpeg dynamic loudnorm + AAC encode (old path)
+  ffmpeg-two-pass  assemble WAV, FFmpeg measurement decode, linear encode
+  in-process       LoudnessMeter pass over the segments, then a piped linear
+                   encode (what --loudnorm two-pass ships)
+
+The in-process and FFmpeg measurements are printed side by side so accuracy
+can be checked too.
+
+    python benchmarks/bench_loudnorm.py --segments 200 --seconds 10
+"""
+import os
+import re
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from _common import load_converter, write_tone_wav
+
+SEGMENT_TYPES = ["heading", "paragraph", "paragraph", "list", "paragraph"]
+
+
+def make_segments(converter, directory, count, seconds):
+    """[(wav_file, Chunk)] for count one-chunk segments of mixed types and levels."""
+    chunks = converter.plan_chunks([("x", SEGMENT_TYPES[i % len(SEGMENT_TYPES)]) for i in range(count)])
+    segments = []
+    for i, chunk in enumerate(chunks):
+        wav_file = os.path.join(directory, f"segment_{i}.wav")
+        write_tone_wav(wav_file, seconds, frequency=180.0 + (i % 9) * 35, amplitude=0.1 + (i % 5) * 0.1)
+        segments.append((wav_file, chunk))
+    return segments
+
+
+def encode(converter, raw_concat, output, measured=None):
+    subprocess.run([converter.require_ffmpeg(), "-y", "-i", raw_concat, "-af", converter.loudnorm_filter(measured),
+                    "-c:a", "aac", "-b:a", "192k", output],
+                   check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+
+def ffmpeg_measure(converter, raw_concat):
+    completed = subprocess.run(
+        [converter.require_ffmpeg(), "-hide_banner", "-i", raw_concat,
+         "-af", converter.loudnorm_filter() + ":print_format=json", "-f", "null", "-"],
+        check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    stats = json.loads(re.findall(r"\{[^{}]*\}", completed.stderr)[-1])
+    return {key: float(stats[key]) for key in ("input_i", "input_lra", "input_tp", "input_thresh")}
+
+
+def run(case, converter, segments, directory):
+    raw_concat = os.path.join(directory, "concat.wav")
+    output = os.path.join(directory, f"{case}.m4a")
+    measured = None
+    start = time.perf_counter()
+    if case == "single-pass":
+        converter.assemble_wav(segments, raw_concat)
+        encode(converter, raw_concat, output)
+    elif case == "ffmpeg-two-pass":
+        converter.assemble_wav(segments, raw_concat)
+        measured = ffmpeg_measure(converter, raw_concat)
+        encode(converter, raw_concat, output, measured)
+    else:
+        audio_format = converter.read_audio_format(segments[0][0])
+        meter = converter.LoudnessMeter(audio_format)
+        for chunk in converter.iter_assembled_pcm(segments, audio_format):
+            meter.add(chunk)
+        measured = meter.result()
+        converter.encode_pcm_stream(converter.iter_assembled_pcm(segments, audio_format), audio_format, output,
+                                    converter.loudnorm_filter(measured))
+    return time.perf_counter() - start, measured
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--segments", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of each synthetic segment")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    converter = load_converter()
+    directory = tempfile.mkdtemp(prefix="bench_loudnorm_")
+    try:
+        segments = make_segments(converter, directory, args.segments, args.seconds)
+        results = []
+        print(f"{'case':<16} {'seconds':>9} {'measured I':>11} {'LRA':>6} {'TP':>7}")
+        for case in ("single-pass", "ffmpeg-two-pass", "in-process"):
+            elapsed, measured = run(case, converter, segments, directory)
+            results.append({"case": case, "seconds": elapsed, "measured": measured})
+            if measured:
+                print(f"{case:<16} {elapsed:>9.2f} {measured['input_i']:>11.2f} "
+                      f"{measured['input_lra']:>6.2f} {measured['input_tp']:>7.2f}")
+            else:
+                print(f"{case:<16} {elapsed:>9.2f} {'-':>11} {'-':>6} {'-':>7}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark every installed PDF text-extraction backend over a corpus and
+report pages per second and peak memory.  With --save the fastest backend is
+recorded where PDF2MP3_PDF_BACKEND=auto will pick it up.
+
+    python benchmarks/bench_pdf_backends.py path/to/pdfs another.pdf --save
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import subprocess
+
+from _common import load_converter, peak_rss_mb
+
+
+def find_pdfs(paths):
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs.extend(sorted(glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True)))
+        else:
+            pdfs.extend(sorted(glob.glob(path)))
+    return pdfs
+
+
+def run_backend(name, pdfs):
+    converter = load_converter()
+    backend = converter.PDF_BACKENDS[name]
+    pages = 0
+    chars = 0
+    start = time.perf_counter()
+    for pdf in pdfs:
+        for page_text in backend.extract_pages(pdf):
+            pages += 1
+            chars += len(page_text)
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": name,
+        "pages": pages,
+        "chars": chars,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 1) if elapsed else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus", nargs="+", help="PDF files, globs or directories")
+    parser.add_argument("--backends", nargs="+", help="limit to these backends (default: all installed)")
+    parser.add_argument("--save", action="store_true", help="record the fastest backend for PDF_BACKEND=auto")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run-backend", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    pdfs = find_pdfs(args.corpus)
+    if not pdfs:
+        sys.exit("No PDF files found in the corpus.")
+
+    if args.run_backend:
+        print(json.dumps(run_backend(args.run_backend, pdfs)))
+        return
+
+    converter = load_converter()
+    backends = args.backends or converter.available_pdf_backends()
+    results = []
+    print(f"Corpus: {len(pdfs)} PDF files")
+    print(f"{'backend':<10} {'pages':>7} {'seconds':>9} {'pages/s':>9} {'peak RSS MB':>12} {'chars':>10}")
+    for name in backends:
+        # A fresh interpreter per backend keeps the peak RSS figures separate.
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--run-backend", name] + pdfs,
+            stdout=subprocess.PIPE, text=True,
+        )
+        if completed.returncode != 0:
+            print(f"{name:<10} failed (exit code {completed.returncode})")
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        results.append(result)
+        rss = result["peak_rss_mb"]
+        print(f"{name:<10} {result['pages']:>7} {result['seconds']:>9.2f} {result['pages_per_second']:>9} "
+              f"{rss if rss is None else round(rss, 1):>12} {result['chars']:>10}")
+
+    if not results:
+        sys.exit("No backend completed.")
+    fastest = max(results, key=lambda result: result["pages_per_second"] or 0)
+    print(f"\nFastest: {fastest['backend']} (set PDF2MP3_PDF_BACKEND={fastest['backend']} or auto)")
+    if args.save:
+        os.makedirs(os.path.dirname(converter.PDF_BACKEND_CHOICE_FILE), exist_ok=True)
+        with open(converter.PDF_BACKEND_CHOICE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"backend": fastest["backend"], "results": results}, f, indent=2)
+        print(f"Saved choice to {converter.PDF_BACKEND_CHOICE_FILE}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
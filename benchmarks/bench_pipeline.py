@@ -0,0 +1,151 @@
+"""
+Benchmark: time and memory of every pipeline stage on a synthetic corpus.
+
+Generates TXT, DOCX and PDF documents of the requested page counts, swaps
+pyttsx3 for the deterministic stub engine in stub_tts.py (through the
+PDF2MP3_TTS_ENGINE hook, so synthesis worker processes use it too) and runs
+extract_text_from_file, preprocess_text_for_tts and plan_chunks, synthesis,
+assembly and the FFmpeg encode one stage at a time.  Every (format, pages)
+case runs in a fresh interpreter; the results are printed and can be saved
+as JSON to compare runs.
+
+    python benchmarks/bench_pipeline.py --pages 10 100 1000 --json pipeline.json
+
+tracemalloc makes the Python-heavy stages noticeably slower; pass
+--no-tracemalloc for timings only.  Memory figures cover this process, not
+the synthesis workers.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+
+from _common import load_converter, peak_rss_mb
+from _corpus import write_document
+
+FORMATS = ["txt", "docx", "pdf"]
+
+
+def measure(stages, stage, trace, func, *args):
+    """Run func(*args) as one stage, appending its timings to stages."""
+    if trace:
+        tracemalloc.start()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    value = func(*args)
+    entry = {
+        "stage": stage,
+        "seconds": round(time.perf_counter() - started, 3),
+        "cpu_seconds": round(time.process_time() - cpu_started, 3),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    if trace:
+        entry["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+        tracemalloc.stop()
+    stages.append(entry)
+    return value
+
+
+def run_case(file_format, pages, directory, workers, trace, time_scale):
+    os.environ["PDF2MP3_TTS_ENGINE"] = "stub_tts:init"
+    os.environ["STUB_TTS_TIME_SCALE"] = str(time_scale)
+    document = write_document(directory, file_format, pages)
+    converter = load_converter()
+    stages = []
+
+    # The readers and planner are lazy; each stage is drained so it can be timed on its own.
+    segments = measure(stages, "extract", trace, lambda: list(converter.extract_text_from_file(document)))
+    prepared = converter.prepare_segments_for_tts(segments)
+    lexicon = converter.get_lexicon()
+    chunks = measure(stages, "preprocess", trace, lambda: list(converter.plan_chunks(
+        (converter.preprocess_text_for_tts(text, lexicon), segment_type) for text, segment_type in prepared)))
+
+    jobs = [(i, chunk.text, chunk.segment_type, os.path.join(directory, f"chunk_{i}.wav"))
+            for i, chunk in enumerate(chunks)]
+    measure(stages, "synthesis", trace, converter.synthesize_segments, jobs, workers)
+
+    temp_wav_files = [(job[3], chunk) for job, chunk in zip(jobs, chunks)]
+    assembled = os.path.join(directory, "assembled.wav")
+    measure(stages, "assembly", trace, converter.assemble_wav, temp_wav_files, assembled)
+    audio_format = converter.read_audio_format(assembled)
+
+    if converter.find_ffmpeg():
+        measure(stages, "encode", trace, converter.encode_pcm_stream,
+                converter.iter_wav_frames(assembled, audio_format), audio_format,
+                os.path.join(directory, "output.m4a"), converter.loudnorm_filter())
+    else:
+        stages.append({"stage": "encode", "skipped": "FFmpeg not found"})
+
+    return {
+        "format": file_format,
+        "pages": pages,
+        "document_mb": round(os.path.getsize(document) / (1024 * 1024), 2),
+        "characters": sum(len(chunk.text) for chunk in chunks),
+        "segments": len(segments),
+        "chunks": len(chunks),
+        "audio_seconds": round(converter.wav_duration_seconds(assembled), 1),
+        "workers": workers,
+        "stages": stages,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--formats", nargs="+", default=FORMATS, choices=FORMATS)
+    parser.add_argument("--workers", type=int, default=1, help="synthesis worker processes")
+    parser.add_argument("--time-scale", type=float, default=0.02,
+                        help="stub speech length relative to real speech (default: %(default)s)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="time the stages without tracemalloc")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    trace = not args.no_tracemalloc
+
+    if args.run_case:
+        directory = tempfile.mkdtemp(prefix="bench_pipeline_")
+        try:
+            result = run_case(args.run_case, args.pages[0], directory, args.workers, trace, args.time_scale)
+            print(json.dumps(result))
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        return
+
+    results = []
+    print(f"{'format':<6} {'pages':>6} {'stage':<11} {'seconds':>9} {'cpu s':>8} {'traced MB':>10} {'peak RSS MB':>12}")
+    for pages in args.pages:
+        for file_format in args.formats:
+            command = [sys.executable, os.path.abspath(__file__), "--run-case", file_format,
+                       "--pages", str(pages), "--workers", str(args.workers), "--time-scale", str(args.time_scale)]
+            if not trace:
+                command.append("--no-tracemalloc")
+            completed = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True)
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            for stage in result["stages"]:
+                if "skipped" in stage:
+                    print(f"{file_format:<6} {pages:>6} {stage['stage']:<11} skipped: {stage['skipped']}")
+                    continue
+                rss = stage["peak_rss_mb"]
+                print(f"{file_format:<6} {pages:>6} {stage['stage']:<11} {stage['seconds']:>9.2f} "
+                      f"{stage['cpu_seconds']:>8.2f} {stage.get('traced_peak_mb', '-'):>10} "
+                      f"{rss if rss is None else round(rss, 1):>12}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "tracemalloc": trace,
+                "time_scale": args.time_scale,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
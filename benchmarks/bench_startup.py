@@ -0,0 +1,132 @@
+"""
+Benchmark: import time and time-to-first-segment of file-to-audio-converter.py.
+
+Every measurement runs in a fresh interpreter, --repeat times; the median and
+the fastest run are reported.
+
+    import          loading the module
+    first-segment   loading the module, extracting a one-page TXT document,
+                    creating the engine, choosing the voice and rendering the
+                    first segment
+
+--baseline REV measures the script as it was at git revision REV as well, so
+a change can be compared with its parent:
+
+    python benchmarks/bench_startup.py --baseline HEAD~1 --json startup.json
+
+The stub engine from stub_tts.py is used unless --real-engine is given, so
+voice enumeration only costs something with the real engine.  The voice
+catalog file lives in a scratch directory shared by the repeats, so runs
+after the first see a warm catalog, as a user's second run would.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from _common import REPO_ROOT, CONVERTER_PATH, load_converter
+from _corpus import write_document
+
+CASES = ["import", "first-segment"]
+
+
+def run_case(case, script, directory, real_engine):
+    started = time.perf_counter()
+    converter = load_converter(script)
+    if case == "import":
+        return time.perf_counter() - started
+
+    document = os.path.join(directory, "corpus_1p.txt")
+    segments = converter.prepare_segments_for_tts(converter.extract_text_from_file(document))
+    if real_engine:
+        engine = converter.create_tts_engine() if hasattr(converter, "create_tts_engine") else converter.pyttsx3.init()
+    else:
+        import stub_tts
+        engine = stub_tts.init()
+    converter.set_voice_to_uk_male(engine)
+    text, segment_type = next(iter(segments))
+    wav_file = os.path.join(directory, "first_segment.wav")
+    if hasattr(converter, "render_segment"):
+        converter.render_segment(engine, converter.preprocess_text_for_tts(text), segment_type, wav_file)
+    else:
+        engine.save_to_file(converter.preprocess_text_for_tts(text), wav_file)
+        engine.runAndWait()
+    return time.perf_counter() - started
+
+
+def measure(label, script, case, directory, repeat, real_engine):
+    command = [sys.executable, os.path.abspath(__file__), "--run-case", case,
+               "--script", script, "--directory", directory]
+    if real_engine:
+        command.append("--real-engine")
+    env = dict(os.environ, PDF2MP3_VOICE_CATALOG_FILE=os.path.join(directory, "voices.json"))
+    if not real_engine:
+        env["PDF2MP3_TTS_ENGINE"] = "stub_tts:init"
+    timings = []
+    for _ in range(repeat):
+        completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, env=env)
+        if completed.returncode != 0:
+            last_line = (completed.stdout.strip().splitlines() or [""])[-1]
+            return {"script": label, "case": case, "error": f"exit status {completed.returncode}: {last_line}"}
+        timings.append(json.loads(completed.stdout.strip().splitlines()[-1])["seconds"])
+    return {"script": label, "case": case, "runs": repeat,
+            "median_seconds": round(statistics.median(timings), 4), "min_seconds": round(min(timings), 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--baseline", metavar="REV", help="also measure the script at this git revision")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cases", nargs="+", default=CASES, choices=CASES)
+    parser.add_argument("--real-engine", action="store_true", help="use pyttsx3 instead of the stub engine")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    parser.add_argument("--script", help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        seconds = run_case(args.run_case, args.script, args.directory, args.real_engine)
+        print(json.dumps({"seconds": seconds}))
+        return
+
+    scratch = tempfile.mkdtemp(prefix="bench_startup_")
+    try:
+        scripts = [("working tree", CONVERTER_PATH)]
+        if args.baseline:
+            baseline_script = os.path.join(scratch, "baseline", "file-to-audio-converter.py")
+            os.makedirs(os.path.dirname(baseline_script))
+            with open(baseline_script, "wb") as f:
+                f.write(subprocess.run(["git", "-C", REPO_ROOT, "show", f"{args.baseline}:file-to-audio-converter.py"],
+                                       check=True, stdout=subprocess.PIPE).stdout)
+            scripts.append((args.baseline, baseline_script))
+
+        results = []
+        print(f"{'script':<14} {'case':<14} {'median s':>9} {'min s':>9}")
+        for label, script in scripts:
+            directory = os.path.join(scratch, str(len(results)))
+            os.makedirs(directory)
+            write_document(directory, "txt", 1)
+            for case in args.cases:
+                result = measure(label, script, case, directory, args.repeat, args.real_engine)
+                results.append(result)
+                if "error" in result:
+                    print(f"{label:<14} {case:<14} failed: {result['error']}")
+                else:
+                    print(f"{label:<14} {case:<14} {result['median_seconds']:>9.3f} {result['min_seconds']:>9.3f}")
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "real_engine": args.real_engine, "results": results},
+                      f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
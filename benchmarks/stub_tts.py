@@ -0,0 +1,80 @@
+"""
+Deterministic stand-in for a pyttsx3 engine, so the pipeline can be
+benchmarked on a headless box without a speech synthesizer:
+
+    PDF2MP3_TTS_ENGINE=stub_tts:init   (with this directory on PYTHONPATH)
+
+save_to_file() + runAndWait() write a mono 16-bit 22050 Hz WAV whose length
+follows the word count and the 'rate' property, as real speech would, with
+100 ms of leading and trailing silence like most engines add.
+STUB_TTS_TIME_SCALE shrinks or stretches the audio (default 1.0) and
+STUB_TTS_SIGNAL picks "tone" (default) or "silence".
+"""
+import os
+import sys
+import math
+import wave
+import array
+from collections import namedtuple
+
+FRAMERATE = 22050
+EDGE_SILENCE_SECONDS = 0.1
+TIME_SCALE = float(os.environ.get("STUB_TTS_TIME_SCALE", "1.0"))
+SIGNAL = os.environ.get("STUB_TTS_SIGNAL", "tone")
+
+Voice = namedtuple("Voice", "id name languages gender age")
+VOICES = [
+    Voice("stub-en-gb-male", "Stub English (UK) male", ["en_GB"], "male", None),
+    Voice("stub-en-us-female", "Stub English (US) female", ["en_US"], "female", None),
+]
+
+
+def _tone_period(frequency=220.0, amplitude=0.3):
+    period = max(1, int(round(FRAMERATE / frequency)))
+    samples = array.array("h", (int(amplitude * 32767 * math.sin(2 * math.pi * n / period))
+                                for n in range(period)))
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+class StubEngine:
+    """The subset of the pyttsx3 engine API the converter uses."""
+
+    def __init__(self):
+        self._properties = {"rate": 200, "volume": 1.0, "voice": VOICES[0].id, "voices": VOICES}
+        self._queue = []
+        self._period = _tone_period() if SIGNAL == "tone" else b"\x00\x00"
+
+    def getProperty(self, name):
+        return self._properties[name]
+
+    def setProperty(self, name, value):
+        self._properties[name] = value
+
+    def save_to_file(self, text, filename):
+        self._queue.append((text, filename))
+
+    def runAndWait(self):
+        queue, self._queue = self._queue, []
+        for text, filename in queue:
+            self._write(text, filename)
+
+    def stop(self):
+        self._queue = []
+
+    def _write(self, text, filename):
+        words = max(1, len(text.split()))
+        seconds = words * 60.0 / self._properties["rate"] * TIME_SCALE
+        speech_bytes = int(seconds * FRAMERATE) * 2
+        edge = b"\x00\x00" * int(EDGE_SILENCE_SECONDS * FRAMERATE)
+        speech = self._period * (speech_bytes // len(self._period) + 1)
+        with wave.open(filename, "wb") as wav_out:
+            wav_out.setnchannels(1)
+            wav_out.setsampwidth(2)
+            wav_out.setframerate(FRAMERATE)
+            wav_out.writeframes(edge + speech[:speech_bytes] + edge)
+
+
+def init(*args, **kwargs):
+    return StubEngine()
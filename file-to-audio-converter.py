@@ -1,82 +1,747 @@
 import os
+import re
 import sys
+import glob
+import json
+import mmap
+import time
+import wave
+import shutil
+import hashlib
+import zipfile
+import posixpath
+import threading
+import argparse
+import contextlib
+import tempfile
+import cProfile
+import tracemalloc
+import functools
+import itertools
+import queue
 import subprocess
-import pyttsx3
-import PyPDF2
-from docx import Document
+import importlib.util
+import multiprocessing.util
+import urllib.error
+import urllib.request
+from collections import deque, namedtuple
+from xml.etree import ElementTree
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+# pyttsx3, PyPDF2, python-docx and pydub are imported where they are first
+# needed, so that importing this module (or running --submit) stays fast.
 try:
-    from pydub import AudioSegment
-except ImportError as e:
-    print("Error: Failed to import pydub. This may be due to missing dependencies like 'audioop-lts' for Python 3.13+.")
-    print("Ensure all required libraries are installed via pip, and FFmpeg is available.")
-    print("Original error:", e)
-    sys.exit(1)
+    import numpy as np
+    numpy_available = True
+except ImportError:
+    numpy_available = False
 
 # ------------------------------------------------------------------
-# 1.  FFmpeg path (unchanged)
+# 1.  FFmpeg discovery – PDF2MP3_FFMPEG, the legacy C:\ffmpeg\bin, then PATH
 # ------------------------------------------------------------------
-ffmpeg_bin = r"C:\ffmpeg\bin"
-ffmpeg_exe  = os.path.join(ffmpeg_bin, "ffmpeg.exe")
-ffprobe_exe = os.path.join(ffmpeg_bin, "ffprobe.exe")
+FFMPEG_LEGACY_DIR = r"C:\ffmpeg\bin"
 
-if os.path.exists(ffmpeg_exe) and os.path.exists(ffprobe_exe):
-    AudioSegment.converter = ffmpeg_exe
-    AudioSegment.ffprobe   = ffprobe_exe
-    print(f"Using FFmpeg from {ffmpeg_bin}")
-else:
-    print(f"FFmpeg executables not found in {ffmpeg_bin}.")
-    print("Please install FFmpeg at this location or adjust the path in the script.")
-    sys.exit(1)
+@functools.lru_cache(maxsize=None)
+def find_ffmpeg():
+    """
+    Path of the ffmpeg executable, or None if there is none.  PDF2MP3_FFMPEG
+    may name the executable or its directory.  Resolved once per process.
+    """
+    candidates = []
+    configured = os.environ.get("PDF2MP3_FFMPEG")
+    if configured:
+        candidates += [configured, os.path.join(configured, "ffmpeg.exe"), os.path.join(configured, "ffmpeg")]
+    candidates.append(os.path.join(FFMPEG_LEGACY_DIR, "ffmpeg.exe"))
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which("ffmpeg")
+
+def require_ffmpeg():
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise FileNotFoundError(f"FFmpeg not found: set PDF2MP3_FFMPEG, install it in {FFMPEG_LEGACY_DIR} "
+                                "or put it on PATH")
+    return ffmpeg
+
+def load_pydub():
+    """pydub's AudioSegment, imported on first use and pointed at find_ffmpeg()."""
+    try:
+        from pydub import AudioSegment
+    except ImportError as e:
+        print("Error: Failed to import pydub. This may be due to missing dependencies like 'audioop-lts' for Python 3.13+.")
+        print("Ensure all required libraries are installed via pip, and FFmpeg is available.")
+        print("Original error:", e)
+        raise
+    ffmpeg = find_ffmpeg()
+    if ffmpeg:
+        AudioSegment.converter = ffmpeg
+        ffprobe = os.path.join(os.path.dirname(ffmpeg), os.path.basename(ffmpeg).replace("ffmpeg", "ffprobe"))
+        if os.path.isfile(ffprobe):
+            AudioSegment.ffprobe = ffprobe
+    return AudioSegment
+
+# ------------------------------------------------------------------
+# 1b.  Tunables (override per deployment via environment variables)
+# ------------------------------------------------------------------
+SYNTHESIS_WORKERS = int(os.environ.get("PDF2MP3_SYNTHESIS_WORKERS", "1"))
+
+HEADING_RATE  = 150
+BODY_RATE     = 170
+SPEECH_VOLUME = 1.0
+
+HEADING_START_PAUSE_MS    = 500
+HEADING_END_PAUSE_MS      = 2000
+PARAGRAPH_END_PAUSE_MS    = 1500
+LIST_QUOTE_START_PAUSE_MS = 750
+
+ASSEMBLY_CHUNK_FRAMES = 65536
+
+# Segments longer than CHUNK_TARGET_CHARS are rendered as several engine calls,
+# split at sentence ends, else at clause breaks, else between words (never
+# inside a word), with these pauses where a split falls.  0 disables splitting.
+CHUNK_TARGET_CHARS      = int(os.environ.get("PDF2MP3_CHUNK_CHARS", "600"))
+CHUNK_SENTENCE_PAUSE_MS = 300
+CHUNK_CLAUSE_PAUSE_MS   = 150
+
+# With NumPy, each rendered segment is trimmed of edge silence quieter than
+# TRIM_SILENCE_DBFS (keeping TRIM_PAD_MS either side) and converted to one
+# canonical format, so the pauses above are exactly what the listener hears.
+TRIM_SILENCE_DBFS    = float(os.environ.get("PDF2MP3_TRIM_SILENCE_DBFS", "-50"))
+TRIM_PAD_MS          = 20
+SEGMENT_AUDIO_FORMAT = (1, 2, 22050)  # channels, sample width, frame rate
+
+# "single-pass" runs FFmpeg's dynamic loudnorm; "two-pass" measures loudness
+# in-process while assembling (needs NumPy) and encodes with linear loudnorm.
+LOUDNORM_MODE = os.environ.get("PDF2MP3_LOUDNORM", "single-pass")
+LOUDNORM_I   = -16
+LOUDNORM_LRA = 11
+LOUDNORM_TP  = -1.5
+
+# "stream" pipes the whole book through loudnorm in one encode; "units" encodes
+# chapter-sized units with one fixed gain, keeps them in <output>.units/ and
+# joins them by stream copy, so a rebuild only re-encodes units that changed.
+# The gain comes from the in-process loudness meter, so "units" needs NumPy.
+OUTPUT_MODE = os.environ.get("PDF2MP3_OUTPUT_MODE", "stream")
+UNIT_MIN_SECONDS = 60
+UNIT_MAX_SECONDS = int(os.environ.get("PDF2MP3_UNIT_MAX_SECONDS", "600"))
+UNIT_GAIN_STEP_DB = 0.5
+UNIT_ENCODE_WORKERS = int(os.environ.get("PDF2MP3_UNIT_ENCODE_WORKERS", str(os.cpu_count() or 1)))
+
+# --serve listens on localhost only; --submit talks to the same address.
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = int(os.environ.get("PDF2MP3_DAEMON_PORT", "8765"))
+DAEMON_QUEUE_SIZE = int(os.environ.get("PDF2MP3_DAEMON_QUEUE_SIZE", "16"))
+DAEMON_POLL_SECONDS = 0.5
+# Finished jobs stay queryable until this many newer ones have finished.
+DAEMON_JOB_HISTORY = int(os.environ.get("PDF2MP3_DAEMON_JOB_HISTORY", "100"))
+# Jobs may only write files with these extensions (the encoder produces AAC).
+DAEMON_OUTPUT_EXTENSIONS = (".m4a",)
+
+SEGMENT_CACHE_DIR = os.environ.get(
+    "PDF2MP3_SEGMENT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf2mp3", "segments"))
+SEGMENT_CACHE_MAX_MB = int(os.environ.get("PDF2MP3_SEGMENT_CACHE_MAX_MB", "2048"))
+
+LEXICON_FILE = os.environ.get("PDF2MP3_LEXICON_FILE") or None
+
+# "pypdf2", "pymupdf", "pypdfium2", "pdfminer", any registered name, or "auto".
+PDF_BACKEND = os.environ.get("PDF2MP3_PDF_BACKEND", "pypdf2")
+PDF_WORKERS = int(os.environ.get("PDF2MP3_PDF_WORKERS", "1"))
+
+# PDF running headers, footers and page numbers are dropped before synthesis.
+# A line counts as running when, among the first/last RUNNING_LINE_ZONE lines
+# of its pages, it recurs (a leading or trailing page number may change with
+# the page, other digits must match) on at least RUNNING_LINE_MIN_PAGES
+# pages and on RUNNING_LINE_MIN_DENSITY of the pages between its first and
+# last occurrence -- so chapter titles that head one page each are kept.
+STRIP_RUNNING_LINES      = os.environ.get("PDF2MP3_STRIP_RUNNING_LINES", "1") != "0"
+RUNNING_LINE_ZONE        = 2
+RUNNING_LINE_MIN_PAGES   = 3
+RUNNING_LINE_MIN_DENSITY = 0.4
+PDF_BACKEND_CHOICE_FILE = os.environ.get(
+    "PDF2MP3_PDF_BACKEND_CHOICE_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf2mp3", "pdf_backend.json"))
+
+# "module:callable" returning a pyttsx3-compatible engine (e.g. the benchmark
+# stub "stub_tts:init"); empty means pyttsx3.init().  Worker processes read it too.
+TTS_ENGINE_FACTORY = os.environ.get("PDF2MP3_TTS_ENGINE", "")
+
+# Installed voices, cached across runs per engine; --refresh-voices rebuilds it.
+VOICE_CATALOG_FILE = os.environ.get(
+    "PDF2MP3_VOICE_CATALOG_FILE",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf2mp3", "voices.json"))
+
+# Part of every cache key: the same text rendered by SAPI5 and eSpeak differs.
+TTS_ENGINE_NAME = TTS_ENGINE_FACTORY or "pyttsx3/" + {"win32": "sapi5", "darwin": "nsss"}.get(sys.platform, "espeak")
+# ...and so is the post-processing the cached WAVs went through.
+SEGMENT_POSTPROCESS = ("trim{}dB+{}ms/{}x{}@{}".format(TRIM_SILENCE_DBFS, TRIM_PAD_MS, *SEGMENT_AUDIO_FORMAT)
+                       if numpy_available else "raw")
+
+# ------------------------------------------------------------------
+# 1c.  PDF text-extraction backends
+#      page_count(pdf_path) -> int
+#      extract_pages(pdf_path, first_page=0, last_page=None) -> page texts,
+#      0-based and end-exclusive, one string per page ("" if it has no text)
+# ------------------------------------------------------------------
+PdfBackend = namedtuple("PdfBackend", "name module page_count extract_pages")
+
+PDF_BACKENDS = {}
+
+# Used by "auto" when no benchmark result has been saved: fastest first.
+PDF_BACKEND_PREFERENCE = ["pymupdf", "pypdfium2", "pdfminer", "pypdf2"]
+
+def register_pdf_backend(name, module, page_count, extract_pages):
+    """Make a backend selectable by name; module is what must be importable."""
+    PDF_BACKENDS[name] = PdfBackend(name, module, page_count, extract_pages)
+
+def _pypdf2_page_count(pdf_path):
+    import PyPDF2
+    with open(pdf_path, 'rb') as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+def _pypdf2_extract_pages(pdf_path, first_page=0, last_page=None):
+    import PyPDF2
+    with open(pdf_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        last_page = len(reader.pages) if last_page is None else min(last_page, len(reader.pages))
+        for page_num in range(first_page, last_page):
+            yield reader.pages[page_num].extract_text() or ""
+
+def _pymupdf_page_count(pdf_path):
+    import fitz
+    with fitz.open(pdf_path) as document:
+        return document.page_count
+
+def _pymupdf_extract_pages(pdf_path, first_page=0, last_page=None):
+    import fitz
+    with fitz.open(pdf_path) as document:
+        last_page = document.page_count if last_page is None else min(last_page, document.page_count)
+        for page_num in range(first_page, last_page):
+            yield document[page_num].get_text()
+
+def _pypdfium2_page_count(pdf_path):
+    import pypdfium2
+    document = pypdfium2.PdfDocument(pdf_path)
+    try:
+        return len(document)
+    finally:
+        document.close()
+
+def _pypdfium2_extract_pages(pdf_path, first_page=0, last_page=None):
+    import pypdfium2
+    document = pypdfium2.PdfDocument(pdf_path)
+    try:
+        last_page = len(document) if last_page is None else min(last_page, len(document))
+        for page_num in range(first_page, last_page):
+            page = document[page_num]
+            text_page = page.get_textpage()
+            yield text_page.get_text_range()
+            text_page.close()
+            page.close()
+    finally:
+        document.close()
+
+def _pdfminer_page_count(pdf_path):
+    from pdfminer.pdfpage import PDFPage
+    with open(pdf_path, 'rb') as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+def _pdfminer_extract_pages(pdf_path, first_page=0, last_page=None):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    if last_page is None:
+        last_page = _pdfminer_page_count(pdf_path)
+    for layout in extract_pages(pdf_path, page_numbers=range(first_page, last_page)):
+        yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+
+register_pdf_backend("pypdf2", "PyPDF2", _pypdf2_page_count, _pypdf2_extract_pages)
+register_pdf_backend("pymupdf", "fitz", _pymupdf_page_count, _pymupdf_extract_pages)
+register_pdf_backend("pypdfium2", "pypdfium2", _pypdfium2_page_count, _pypdfium2_extract_pages)
+register_pdf_backend("pdfminer", "pdfminer", _pdfminer_page_count, _pdfminer_extract_pages)
+
+def available_pdf_backends():
+    return [name for name, backend in PDF_BACKENDS.items() if importlib.util.find_spec(backend.module)]
+
+def _saved_pdf_backend_choice():
+    try:
+        with open(PDF_BACKEND_CHOICE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get("backend")
+    except (OSError, ValueError):
+        return None
+
+def get_pdf_backend(name=PDF_BACKEND):
+    """
+    Resolve a backend name.  "auto" takes the winner saved by
+    benchmarks/bench_pdf_backends.py --save, else the first installed backend
+    in PDF_BACKEND_PREFERENCE.  Unknown or missing backends fall back to PyPDF2.
+    """
+    available = available_pdf_backends()
+    if name == "auto":
+        saved = _saved_pdf_backend_choice()
+        name = saved if saved in available else next(
+            (candidate for candidate in PDF_BACKEND_PREFERENCE if candidate in available), "pypdf2")
+    if name not in available:
+        print(f"PDF backend '{name}' is not available; using pypdf2.")
+        name = "pypdf2"
+    return PDF_BACKENDS[name]
+
+# ------------------------------------------------------------------
+# 1d.  Stage metrics – wall/CPU time, peak RSS and throughput per stage
+# ------------------------------------------------------------------
+STAGE_FIELDS = ("calls", "wall_seconds", "cpu_seconds", "characters", "audio_seconds")
+
+def _cpu_seconds():
+    """CPU time of this process and its finished child processes (worker pools)."""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS and kilobytes on Linux.
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+class RunMetrics:
+    """
+    Per-stage totals for this process.  stage(name) is a context manager whose
+    record takes "characters" and "audio_seconds" once they are known.  With
+    profile set, each stage runs under cProfile and tracemalloc and the
+    slowest one is kept for dump_profile().  The class attributes below name
+    the stages the run totals come from and how segment_seconds is reported,
+    so that the OCR script can reuse this class for its own stages.
+    """
+    TOTAL_CHARACTERS_STAGE = "preprocess"
+    TOTAL_AUDIO_STAGE = "encode"
+    TIMINGS_KEY = "segments"
+    TIMINGS_METRIC = "pdf2mp3_segment_synthesis_seconds"
+    TIMINGS_HELP = "Synthesis time per rendered segment."
+    PROFILE_PREFIX = "pdf2mp3-"
+
+    def __init__(self, profile=False):
+        self.stages = {}
+        self.segment_seconds = []  # synthesis time of every rendered segment
+        self.profile = profile
+        self.slowest = None
+
+    @contextlib.contextmanager
+    def stage(self, name, characters=0, audio_seconds=0.0):
+        record = {"characters": characters, "audio_seconds": audio_seconds}
+        profiler = None
+        if self.profile and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            profiler = cProfile.Profile()
+            profiler.enable()
+        wall, cpu = time.perf_counter(), _cpu_seconds()
+        try:
+            yield record
+        finally:
+            wall, cpu = time.perf_counter() - wall, _cpu_seconds() - cpu
+            if profiler is not None:
+                profiler.disable()
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                if self.slowest is None or wall > self.slowest[0]:
+                    self.slowest = (wall, name, profiler, snapshot)
+            totals = self.stages.setdefault(name, dict.fromkeys(STAGE_FIELDS, 0))
+            for field, value in zip(STAGE_FIELDS, (1, wall, cpu, record["characters"], record["audio_seconds"])):
+                totals[field] += value
+            totals["peak_rss_mb"] = _peak_rss_mb()
+
+    def mark(self):
+        return {name: dict(totals) for name, totals in self.stages.items()}, len(self.segment_seconds)
+
+    def since(self, mark):
+        """Totals recorded after mark(), as plain data that merge() accepts in another process."""
+        stages_before, segments_before = mark
+        stages = {}
+        for name, totals in self.stages.items():
+            before = stages_before.get(name, {})
+            delta = {field: totals[field] - before.get(field, 0) for field in STAGE_FIELDS}
+            if delta["calls"]:
+                delta["peak_rss_mb"] = totals["peak_rss_mb"]
+                stages[name] = delta
+        return {"stages": stages, "segment_seconds": self.segment_seconds[segments_before:]}
+
+    def merge(self, recorded):
+        for name, delta in recorded["stages"].items():
+            totals = self.stages.setdefault(name, dict.fromkeys(STAGE_FIELDS, 0))
+            for field in STAGE_FIELDS:
+                totals[field] += delta[field]
+            totals["peak_rss_mb"] = max(filter(None, (totals.get("peak_rss_mb"), delta["peak_rss_mb"])), default=None)
+        self.segment_seconds.extend(recorded["segment_seconds"])
+
+    def summary(self):
+        """Totals plus characters/s and real-time factor (audio seconds per wall second) per stage."""
+        def with_rates(totals):
+            entry = dict(totals)
+            wall = entry["wall_seconds"]
+            entry["chars_per_second"] = entry["characters"] / wall if wall and entry["characters"] else None
+            entry["real_time_factor"] = entry["audio_seconds"] / wall if wall and entry["audio_seconds"] else None
+            return entry
+        # Stage time only, so prompts and idle daemon time do not dilute the rates.
+        total = {"calls": 1,
+                 "wall_seconds": sum(totals["wall_seconds"] for totals in self.stages.values()),
+                 "cpu_seconds": sum(totals["cpu_seconds"] for totals in self.stages.values()),
+                 "characters": self.stages.get(self.TOTAL_CHARACTERS_STAGE, {}).get("characters", 0),
+                 "audio_seconds": self.stages.get(self.TOTAL_AUDIO_STAGE, {}).get("audio_seconds", 0),
+                 "peak_rss_mb": _peak_rss_mb()}
+        segments = sorted(self.segment_seconds)
+        return {
+            "total": with_rates(total),
+            "stages": {name: with_rates(totals) for name, totals in self.stages.items()},
+            self.TIMINGS_KEY: {
+                "count": len(segments),
+                "sum_seconds": sum(segments),
+                "p50_seconds": segments[len(segments) // 2] if segments else None,
+                "p95_seconds": segments[int(len(segments) * 0.95)] if segments else None,
+                "max_seconds": segments[-1] if segments else None,
+            },
+        }
+
+    def write(self, path):
+        """Write summary() to path: JSON for *.json, Prometheus text format otherwise."""
+        summary = self.summary()
+        if path.lower().endswith(".json"):
+            text = json.dumps(summary, indent=2)
+        else:
+            text = self.prometheus_text(summary)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    PROMETHEUS_HELP = {
+        "calls": "Times the stage ran.",
+        "wall_seconds": "Wall-clock seconds spent in the stage.",
+        "cpu_seconds": "CPU seconds of this process and its finished workers during the stage.",
+        "characters": "Characters of text handled by the stage.",
+        "audio_seconds": "Seconds of audio produced or handled by the stage.",
+        "peak_rss_mb": "Peak resident set size of the process, in MB, when the stage ended.",
+        "chars_per_second": "Characters handled per wall-clock second.",
+        "real_time_factor": "Audio seconds handled per wall-clock second.",
+    }
+
+    @classmethod
+    def prometheus_text(cls, summary):
+        entries = [("total", summary["total"])] + list(summary["stages"].items())
+        lines = []
+        for field, help_text in cls.PROMETHEUS_HELP.items():
+            lines += [f"# HELP pdf2mp3_stage_{field} {help_text}", f"# TYPE pdf2mp3_stage_{field} gauge"]
+            lines += [f'pdf2mp3_stage_{field}{{stage="{name}"}} {entry[field]:.6g}'
+                      for name, entry in entries if entry.get(field) is not None]
+        timings, metric = summary[cls.TIMINGS_KEY], cls.TIMINGS_METRIC
+        lines += [f"# HELP {metric} {cls.TIMINGS_HELP}", f"# TYPE {metric} summary"]
+        for quantile, field in (("0.5", "p50_seconds"), ("0.95", "p95_seconds")):
+            if timings[field] is not None:
+                lines.append(f'{metric}{{quantile="{quantile}"}} {timings[field]:.6g}')
+        lines += [f"{metric}_sum {timings['sum_seconds']:.6g}", f"{metric}_count {timings['count']}"]
+        return "\n".join(lines) + "\n"
+
+    def dump_profile(self, directory="."):
+        """Save the slowest stage's cProfile stats and tracemalloc snapshot into directory."""
+        if self.slowest is None:
+            print("No stage was profiled.")
+            return
+        wall, name, profiler, snapshot = self.slowest
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.PROFILE_PREFIX}{name}")
+        profiler.dump_stats(base + ".prof")
+        snapshot.dump(base + ".tracemalloc")
+        print(f"Slowest stage '{name}' ({wall:.2f}s): cProfile stats in {base}.prof, "
+              f"tracemalloc snapshot in {base}.tracemalloc")
+        for statistic in snapshot.statistics("lineno")[:5]:
+            print(f"  {statistic}")
+
+run_metrics = RunMetrics()
+
+def _disable_stage_profiling():
+    """Pool initializer: profiles taken in worker processes could not be reported."""
+    run_metrics.profile = False
 
 # ------------------------------------------------------------------
-# 2.  All helper functions up to convert_text_to_audio()
-#     (identical to original)
+# 2.  Text extraction and preparation – TXT/DOCX/PDF readers, running
+#     lines, lexicon preprocessing and voice selection
 # ------------------------------------------------------------------
-def extract_text_from_file(file_path):
+def classify_text_segment(segment):
+    """Heading/list/paragraph heuristic for TXT and PDF text, which carry no styles."""
+    if len(segment) < 50:
+        return "heading"
+    if segment.startswith(('- ', '* ', '1. ', '2. ', '3. ')):
+        return "list"
+    return "paragraph"
+
+def segment_page_text(page_text):
+    segments = [s.strip() for s in page_text.split('\n\n') if s.strip()]
+    return [(segment, classify_text_segment(segment)) for segment in segments]
+
+# A line break followed by one or more empty lines: the '\n\n' that
+# segment_page_text() splits on.  Text mode reads \r\n and \r as \n too; files
+# without any \r take the much cheaper pattern.
+_TXT_PARAGRAPH_BREAK = re.compile(rb"\n\n+")
+_TXT_PARAGRAPH_BREAK_ANY_NEWLINE = re.compile(rb"(?:\r\n|\r(?!\n)|\n)(?:\r\n|\r(?!\n)|\n)+")
+
+def _txt_paragraph(data, encoding, carriage_returns):
+    segment = data.decode(encoding)
+    if carriage_returns:
+        segment = segment.replace('\r\n', '\n').replace('\r', '\n')
+    segment = segment.strip()
+    if segment:
+        yield segment, classify_text_segment(segment)
+
+def iter_txt_segments(file_path, encoding='utf-8'):
+    """
+    Yield (text, segment_type) for every paragraph of a text file, as
+    segment_page_text(open(file_path).read()) would, without reading the file
+    into memory: the file is memory-mapped and scanned for blank lines, and
+    only the current paragraph is copied out and decoded.  Breaks are ASCII
+    bytes, so a paragraph never ends inside a multi-byte character.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            carriage_returns = mapped.find(b"\r") != -1
+            paragraph_break = _TXT_PARAGRAPH_BREAK_ANY_NEWLINE if carriage_returns else _TXT_PARAGRAPH_BREAK
+            start = 0
+            for match in paragraph_break.finditer(mapped):
+                yield from _txt_paragraph(mapped[start:match.start()], encoding, carriage_returns)
+                start = match.end()
+            yield from _txt_paragraph(mapped[start:], encoding, carriage_returns)
+
+# A line holding nothing but a page number: "12", "- 12 -", "Page 3 of 40", "xiv".
+# Roman numerals must be well formed, so words such as "Did" or "Civil" do not match.
+PAGE_NUMBER_LINE = re.compile(r"[-\u2013\u2014\s]*(?:page\s*)?"
+                              r"(?:\d+|(?=[ivxlcdm])m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3}))"
+                              r"(?:\s*(?:of|/)\s*\d+)?[-\u2013\u2014\s]*", re.IGNORECASE)
+
+PAGE_NUMBER_TOKEN = re.compile(r"^(\d+)\b(.*)$|^(.*?)\b(\d+)$")
+
+def _running_line_key(zone, line, page_number):
+    # All page numbers in a zone share one key, so they count as running
+    # lines only when they recur there; a lone "12" or "II" heading is kept.
+    if PAGE_NUMBER_LINE.fullmatch(line):
+        return zone, "#page", None
+    text = " ".join(line.lower().split())
+    # A leading or trailing number is folded only together with its offset
+    # from the page index: "Book Title 45" on every page keeps one key, while
+    # "Exercise 12" and "Exercise 13" headings on unrelated pages do not.
+    match = PAGE_NUMBER_TOKEN.match(text)
+    if not match:
+        return zone, text, None
+    if match.group(1) is not None:
+        return zone, "#" + match.group(2), int(match.group(1)) - page_number
+    return zone, match.group(3) + "#", int(match.group(4)) - page_number
+
+def strip_running_lines(page_texts, zone=RUNNING_LINE_ZONE, min_pages=RUNNING_LINE_MIN_PAGES,
+                        min_density=RUNNING_LINE_MIN_DENSITY):
+    """
+    Drop running headers, footers and page numbers from the first and last
+    zone non-blank lines of every page (see RUNNING_LINE_*).
+    Returns (cleaned page texts, removed lines).
+    """
+    pages = [page_text.split("\n") for page_text in page_texts]
+    candidates = []
+    seen_on = {}
+    for page_number, lines in enumerate(pages):
+        filled = [i for i, line in enumerate(lines) if line.strip()]
+        top = filled[:zone]
+        entries = [(i, _running_line_key("top", lines[i], page_number)) for i in top]
+        entries += [(i, _running_line_key("bottom", lines[i], page_number))
+                    for i in filled[-zone:] if i not in top]
+        candidates.append(entries)
+        for key in {key for _, key in entries}:
+            seen_on.setdefault(key, []).append(page_number)
+    running = {key for key, page_numbers in seen_on.items()
+               if len(page_numbers) >= min_pages
+               and len(page_numbers) / (page_numbers[-1] - page_numbers[0] + 1) >= min_density}
+
+    cleaned, removed = [], []
+    for lines, entries in zip(pages, candidates):
+        drop = {i for i, key in entries if key in running}
+        removed.extend(lines[i].strip() for i in sorted(drop))
+        cleaned.append("\n".join(line for i, line in enumerate(lines) if i not in drop))
+    return cleaned, removed
+
+def _extract_pdf_page_range(task):
+    pdf_path, backend, first_page, last_page = task
+    return [page_text or "" for page_text in backend.extract_pages(pdf_path, first_page, last_page)]
+
+def extract_pdf_segments(pdf_path, backend, workers=1, strip_running=STRIP_RUNNING_LINES):
+    """
+    Extract and classify every page of pdf_path.  With workers > 1 the page
+    range is split into slices, each worker opens its own reader, and the
+    slices are merged back in page order, so the result matches the serial path.
+    Running headers, footers and page numbers are found across all pages, so
+    workers return raw page texts and the classification happens here.
+    """
+    if workers <= 1:
+        page_texts = _extract_pdf_page_range((pdf_path, backend, 0, None))
+    else:
+        page_count = backend.page_count(pdf_path)
+        # Several slices per worker so one dense slice does not hold up the rest.
+        pages_per_task = max(1, -(-page_count // (workers * 4)))
+        tasks = [(pdf_path, backend, first_page, min(first_page + pages_per_task, page_count))
+                 for first_page in range(0, page_count, pages_per_task)]
+        page_texts = []
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for slice_texts in pool.map(_extract_pdf_page_range, tasks):
+                page_texts.extend(slice_texts)
+
+    if not strip_running:
+        return [segment for page_text in page_texts for segment in segment_page_text(page_text)]
+    cleaned, removed = strip_running_lines(page_texts)
+    text_segments = [segment for page_text in cleaned for segment in segment_page_text(page_text)]
+    if removed:
+        # Estimate: the words at body rate, plus heading pauses for every
+        # segment that consisted of nothing but such lines.
+        dropped_segments = (sum(len(segment_page_text(page_text)) for page_text in page_texts)
+                            - len(text_segments))
+        seconds = (sum(len(line.split()) for line in removed) * 60.0 / BODY_RATE
+                   + dropped_segments * (HEADING_START_PAUSE_MS + HEADING_END_PAUSE_MS) / 1000.0)
+        print(f"Removed {len(removed)} running header/footer and page-number lines "
+              f"({sum(len(line) for line in removed)} characters, about {seconds / 60:.1f} minutes of audio).")
+    return text_segments
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+RELS_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+STYLES_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+# Text equivalents of run children, as python-docx's Run.text; <w:t> is handled apart.
+DOCX_RUN_TEXT = {W_NS + "tab": "\t", W_NS + "ptab": "\t", W_NS + "cr": "\n", W_NS + "noBreakHyphen": "-"}
+
+def _docx_relationship_target(package, source_part, relationship_type, default):
+    """Resolve the part that source_part links to with relationship_type, or default."""
+    directory, name = posixpath.split(source_part)
+    try:
+        with package.open(posixpath.join(directory, "_rels", name + ".rels")) as f:
+            relationships = ElementTree.parse(f).getroot()
+    except KeyError:
+        return default
+    for relationship in relationships.iter(RELS_NS + "Relationship"):
+        if relationship.get("Type") == relationship_type and relationship.get("TargetMode") != "External":
+            target = relationship.get("Target", "")
+            if target.startswith("/"):
+                return target.lstrip("/")
+            return posixpath.normpath(posixpath.join(directory, target))
+    return default
+
+def docx_paragraph_style_names(package, styles_part):
+    """{styleId: name} of the paragraph styles in styles_part; the default style is also under None."""
+    names = {None: "Normal"}
+    try:
+        f = package.open(styles_part)
+    except KeyError:
+        return names
+    with f:
+        for _, element in ElementTree.iterparse(f):
+            if element.tag != W_NS + "style":
+                continue
+            if element.get(W_NS + "type") == "paragraph":
+                name_element = element.find(W_NS + "name")
+                name = name_element.get(W_NS + "val", "") if name_element is not None else ""
+                names[element.get(W_NS + "styleId")] = name
+                if element.get(W_NS + "default") in ("1", "true", "on"):
+                    names[None] = name
+            element.clear()
+    return names
+
+def _docx_paragraph_text(paragraph):
+    """Text of a <w:p>, matching python-docx's Paragraph.text: its runs, including those in hyperlinks."""
+    parts = []
+    for child in paragraph:
+        if child.tag == W_NS + "r":
+            runs = [child]
+        elif child.tag == W_NS + "hyperlink":
+            runs = child.findall(W_NS + "r")
+        else:
+            continue
+        for run in runs:
+            for item in run:
+                if item.tag == W_NS + "t":
+                    parts.append(item.text or "")
+                elif item.tag == W_NS + "br":
+                    # Page and column breaks carry no text.
+                    if item.get(W_NS + "type", "textWrapping") == "textWrapping":
+                        parts.append("\n")
+                else:
+                    parts.append(DOCX_RUN_TEXT.get(item.tag, ""))
+    return "".join(parts)
+
+def classify_docx_paragraph(text, style_name):
+    style_name = style_name.lower()
+    if "heading" in style_name:
+        return "heading"
+    if "list" in style_name or text.startswith(('- ', '* ', '1. ', '2. ', '3. ')):
+        return "list"
+    if "quote" in style_name:
+        return "quote"
+    return "paragraph"
+
+def iter_docx_segments(file_path):
+    """
+    Yield (text, segment_type) for every non-empty body paragraph of a DOCX
+    file, in order.  document.xml is parsed incrementally and each top-level
+    block is dropped once read, so memory stays at one paragraph or table
+    rather than python-docx's whole object model.  Paragraphs inside tables
+    are skipped, as with python-docx's document.paragraphs.
+    """
+    with zipfile.ZipFile(file_path) as package:
+        document_part = _docx_relationship_target(package, "", OFFICE_DOCUMENT_REL, "word/document.xml")
+        style_names = docx_paragraph_style_names(
+            package, _docx_relationship_target(package, document_part, STYLES_REL, "word/styles.xml"))
+        with package.open(document_part) as f:
+            depth = 0
+            body = None
+            for event, element in ElementTree.iterparse(f, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if depth == 2 and element.tag == W_NS + "body":
+                        body = element
+                    continue
+                depth -= 1
+                # depth now counts the ancestors of element: 2 for children of <w:body>.
+                if depth != 2 or body is None:
+                    continue
+                if element.tag == W_NS + "p":
+                    text = _docx_paragraph_text(element).strip()
+                    if text:
+                        style = element.find(f"{W_NS}pPr/{W_NS}pStyle")
+                        style_id = style.get(W_NS + "val") if style is not None else None
+                        style_name = style_names.get(style_id, style_names[None])
+                        yield text, classify_docx_paragraph(text, style_name)
+                body.clear()
+
+def extract_text_from_file(file_path, pdf_backend=PDF_BACKEND, pdf_workers=PDF_WORKERS,
+                           strip_running=STRIP_RUNNING_LINES):
+    """
+    The document's (text, segment_type) segments, or None if it has none or
+    cannot be read.  TXT and DOCX segments come as a lazy iterator, read one
+    paragraph at a time as the caller consumes them; PDFs, whose running lines
+    are found across all pages, come as a list.
+    """
     file_extension = os.path.splitext(file_path)[1].lower()
     text_segments = []
     try:
-        if file_extension == ".txt":
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-                segments = [s.strip() for s in text.split('\n\n') if s.strip()]
-                for segment in segments:
-                    if len(segment) < 50:
-                        segment_type = "heading"
-                    elif segment.startswith(('- ', '* ', '1. ', '2. ', '3. ')):
-                        segment_type = "list"
-                    else:
-                        segment_type = "paragraph"
-                    text_segments.append((segment, segment_type))
-        elif file_extension in [".docx", ".doc"]:
-            document = Document(file_path)
-            for paragraph in document.paragraphs:
-                if paragraph.text.strip():
-                    style_name = paragraph.style.name.lower()
-                    if "heading" in style_name:
-                        segment_type = "heading"
-                    elif "list" in style_name or paragraph.text.strip().startswith(('- ', '* ', '1. ', '2. ', '3. ')):
-                        segment_type = "list"
-                    elif "quote" in style_name:
-                        segment_type = "quote"
-                    else:
-                        segment_type = "paragraph"
-                    text_segments.append((paragraph.text.strip(), segment_type))
+        if file_extension in [".txt", ".docx", ".doc"]:
+            reader = iter_txt_segments(file_path) if file_extension == ".txt" else iter_docx_segments(file_path)
+            # Read the first segment now, so that a missing or unreadable file is reported here.
+            first = next(reader, None)
+            return None if first is None else itertools.chain([first], reader)
         elif file_extension == ".pdf":
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        page_segments = [s.strip() for s in page_text.split('\n\n') if s.strip()]
-                        for segment in page_segments:
-                            if len(segment) < 50:
-                                segment_type = "heading"
-                            elif segment.startswith(('- ', '* ', '1. ', '2. ', '3. ')):
-                                segment_type = "list"
-                            else:
-                                segment_type = "paragraph"
-                            text_segments.append((segment, segment_type))
+            backend = get_pdf_backend(pdf_backend)
+            if pdf_workers > 1:
+                print(f"Extracting PDF pages with {pdf_workers} worker processes...")
+            text_segments = extract_pdf_segments(file_path, backend, pdf_workers, strip_running)
         else:
             print(f"Error: Unsupported file type '{file_extension}'.")
             return None
@@ -88,211 +753,1475 @@ def extract_text_from_file(file_path):
         return None
     return text_segments if text_segments else None
 
-def save_text_to_file(text_segments, temp_file="temp.txt"):
-    try:
-        unified_text = " ".join(segment[0] for segment in text_segments).replace("\n", " ")
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            f.write(unified_text)
-        print(f"Successfully saved text to {temp_file}")
-        return temp_file
-    except Exception as e:
-        print(f"Error saving text to {temp_file}: {e}")
-        return None
+def prepare_segments_for_tts(text_segments):
+    """
+    Lowercase each segment and fold its line breaks into spaces, lazily,
+    keeping the segment boundaries and types that drive the pauses.
+    """
+    return ((text.replace("\n", " ").lower(), segment_type) for text, segment_type in text_segments)
 
-def create_lowercase_text_file(input_file, output_file="small_letter_temp.txt"):
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            text = f.read().lower()
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(text)
-        print(f"Successfully created lowercase text file: {output_file}")
-        return output_file
-    except Exception as e:
-        print(f"Error creating lowercase text file {output_file}: {e}")
-        return None
+DEFAULT_LEXICON = {
+    "testing": "test-ing,",
+    "we": "wee,",
+    "data": "dah-ta,",
+    "ai": "A I",
+    "read": "red,",
+    "algorithm": "al-go-rithm,",
+    "neural": "new-ral,",
+    "software": "soft-ware,",
+    "api": "A P I,"
+}
 
-def read_text_from_file(temp_file):
-    try:
-        with open(temp_file, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Error reading from {temp_file}: {e}")
-        return None
+def _trie_pattern(words):
+    """
+    Regex source matching any of words, factored as a character trie so the
+    engine does one walk per text position no matter how many rules there are.
+    Optional groups are greedy, so the longest rule that fits wins.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
 
-def preprocess_text_for_tts(text):
-    replacements = {
-        "testing": "test-ing,",
-        "we": "wee,",
-        "data": "dah-ta,",
-        " ai ": " A I ",
-        "read": "red,",
-        "algorithm": "al-go-rithm,",
-        "neural": "new-ral,",
-        "software": "soft-ware,",
-        "api": "A P I,"
-    }
-    for original, replacement in replacements.items():
-        text = text.replace(original, replacement)
-    return text
+    def render(node):
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return render(trie)
+
+def compile_lexicon(rules):
+    """Compile {original: replacement} rules into a (pattern, rules) pair."""
+    rules = {original: replacement for original, replacement in rules.items() if original}
+    if not rules:
+        return None, rules
+    # Lookarounds rather than \b so rules such as "c++" still match whole words.
+    pattern = re.compile(r"(?<!\w)" + _trie_pattern(rules) + r"(?!\w)")
+    return pattern, rules
+
+def load_lexicon_file(path):
+    """
+    Read one rule per line, "original = replacement" or tab separated.
+    Blank lines and lines starting with # are ignored.
+    """
+    rules = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            original, separator, replacement = line.partition("\t" if "\t" in line else "=")
+            if not separator or not original.strip():
+                print(f"Skipping malformed lexicon line {line_number} in {path}: {line}")
+                continue
+            rules[original.strip()] = replacement.strip()
+    return rules
+
+@functools.lru_cache(maxsize=8)
+def _compiled_lexicon(path, mtime):
+    rules = dict(DEFAULT_LEXICON)
+    if path:
+        rules.update(load_lexicon_file(path))
+        print(f"Loaded pronunciation lexicon {path} ({len(rules)} rules)")
+    return compile_lexicon(rules)
+
+def get_lexicon(path=LEXICON_FILE):
+    """The built-in rules plus those in path, compiled once per file version."""
+    return _compiled_lexicon(path, os.path.getmtime(path) if path else None)
+
+def preprocess_text_for_tts(text, lexicon=None):
+    pattern, replacements = lexicon or get_lexicon()
+    if pattern is None:
+        return text
+    return pattern.sub(lambda match: replacements[match.group(0)], text)
+
+def voice_catalog(engine=None, refresh=False):
+    """
+    [{"id", "name"}] for the installed voices.  Enumerating voices is slow
+    with SAPI5, so the list is kept in VOICE_CATALOG_FILE across runs and
+    the engine is only asked (or created) when that file is missing or stale.
+    """
+    if not refresh:
+        try:
+            with open(VOICE_CATALOG_FILE, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("engine") == TTS_ENGINE_NAME:
+                return cached["voices"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+    engine = engine or create_tts_engine()
+    voices = [{"id": voice.id, "name": voice.name} for voice in engine.getProperty('voices')]
+    try:
+        os.makedirs(os.path.dirname(VOICE_CATALOG_FILE) or ".", exist_ok=True)
+        partial = f"{VOICE_CATALOG_FILE}.{os.getpid()}.part"
+        with open(partial, 'w', encoding='utf-8') as f:
+            json.dump({"engine": TTS_ENGINE_NAME, "voices": voices}, f, indent=2)
+        os.replace(partial, VOICE_CATALOG_FILE)
+    except OSError:
+        pass
+    return voices
 
 def set_voice_to_uk_male(engine):
-    voices = engine.getProperty('voices')
+    voices = voice_catalog(engine)
     found_voice = False
     for voice in voices:
-        if "en-gb" in voice.id.lower() and "male" in voice.id.lower():
-            engine.setProperty('voice', voice.id)
-            print(f"Using UK male voice: {voice.name}")
+        if "en-gb" in voice["id"].lower() and "male" in voice["id"].lower():
+            engine.setProperty('voice', voice["id"])
+            print(f"Using UK male voice: {voice['name']}")
             found_voice = True
             break
     if not found_voice:
         print("A UK male voice could not be found. Using the default system voice.")
 
 # ------------------------------------------------------------------
-# 3.  convert_text_to_audio()  – now with loudnorm
+# 2a.  Chunk planning – bounded text per engine call, pauses per chunk
+# ------------------------------------------------------------------
+# One engine call: its text, the type and index of the segment it comes from,
+# and the silence the assembler puts before and after it.
+Chunk = namedtuple("Chunk", "text segment_type source pause_before_ms pause_after_ms")
+
+# A full stop after one of these, or after a lone letter ("e.g.", "j. smith"),
+# does not end a sentence.
+CHUNK_ABBREVIATIONS = ["mr", "mrs", "ms", "dr", "prof", "st", "jr", "sr", "vs", "fig", "mt"]
+
+# Split points from coarsest to finest; each pattern matches the separator the
+# text is cut after.
+CHUNK_BOUNDARIES = [
+    (re.compile(r"(?:[!?\u2026]|" + "".join(rf"(?<!\b{word})" for word in CHUNK_ABBREVIATIONS) +
+                r"(?<!\b\w)\.)[.!?\u2026]*[\"')\]\u2019\u201d]*\s+", re.IGNORECASE), CHUNK_SENTENCE_PAUSE_MS),
+    (re.compile(r"[,;:\u2013\u2014]+\s+|\s+[-\u2013\u2014]+\s+"), CHUNK_CLAUSE_PAUSE_MS),
+    (re.compile(r"\s+"), 0),
+]
+
+def _split_after(text, pattern):
+    pieces, start = [], 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start:match.end()].strip())
+        start = match.end()
+    pieces.append(text[start:].strip())
+    return [piece for piece in pieces if piece]
+
+def _pack_text(text, target_chars, level=0):
+    """
+    [[piece, pause_after_ms]] covering text, each piece at most target_chars
+    long unless it is a single word.  Pieces are packed greedily from the
+    parts at this level's boundaries; a part that is still too long is split
+    at the next level down.
+    """
+    if len(text) <= target_chars or level == len(CHUNK_BOUNDARIES):
+        return [[text, 0]]
+    pattern, pause_ms = CHUNK_BOUNDARIES[level]
+    pieces, current = [], ""
+    for part in _split_after(text, pattern):
+        if current and len(current) + 1 + len(part) <= target_chars:
+            current += " " + part
+            continue
+        if current:
+            pieces.append([current, pause_ms])
+            current = ""
+        if len(part) > target_chars:
+            pieces.extend(_pack_text(part, target_chars, level + 1))
+            pieces[-1][1] = pause_ms
+        else:
+            current = part
+    if current:
+        pieces.append([current, pause_ms])
+    return pieces
+
+def plan_chunks(text_segments, target_chars=CHUNK_TARGET_CHARS):
+    """
+    Turn (text, segment_type) segments into Chunks of at most target_chars
+    (see _pack_text).  Blank segments are dropped; a segment that fits is one
+    chunk with its text unchanged.  The first chunk of a segment carries the
+    segment's start pause and the last its end pause.  Segments are read
+    lazily, one ahead of the chunks yielded, so a book never has to be in
+    memory more than once.
+    """
+    spoken = ((source, text, segment_type) for source, (text, segment_type) in enumerate(text_segments)
+              if text.strip())
+    following = next(spoken, None)
+    i = 0
+    while following is not None:
+        (source, text, segment_type), following = following, next(spoken, None)
+        pieces = _pack_text(text, target_chars) if target_chars > 0 else [[text, 0]]
+        pieces[-1][1] = pause_after_ms(segment_type, is_last=following is None)
+        pause_before = pause_before_ms(i, segment_type)
+        for piece, pause_after in pieces:
+            yield Chunk(piece, segment_type, source, pause_before, pause_after)
+            pause_before = 0
+        i += 1
+
+# ------------------------------------------------------------------
+# 2b.  Segment synthesis – serial, or one warm engine per worker process
+# ------------------------------------------------------------------
+def segment_rate(segment_type):
+    return HEADING_RATE if segment_type == "heading" else BODY_RATE
+
+def create_tts_engine():
+    """pyttsx3.init(), or the engine factory named by TTS_ENGINE_FACTORY."""
+    if not TTS_ENGINE_FACTORY:
+        import pyttsx3
+        return pyttsx3.init()
+    module_name, _, factory = TTS_ENGINE_FACTORY.partition(":")
+    return getattr(importlib.import_module(module_name), factory or "init")()
+
+def render_segment(engine, text, segment_type, wav_file):
+    engine.setProperty('rate', segment_rate(segment_type))
+    engine.setProperty('volume', SPEECH_VOLUME)
+    engine.save_to_file(text, wav_file)
+    engine.runAndWait()
+    if numpy_available:
+        postprocess_segment(wav_file)
+
+_worker_engine = None
+
+def _init_synthesis_worker():
+    global _worker_engine
+    _worker_engine = create_tts_engine()
+    set_voice_to_uk_male(_worker_engine)
+
+def _render_segment_in_worker(job):
+    index, text, segment_type, wav_file = job
+    started = time.perf_counter()
+    render_segment(_worker_engine, text, segment_type, wav_file)
+    return index, time.perf_counter() - started
+
+def synthesize_segments(jobs, workers=1, engine=None, on_done=None, pool=None):
+    """
+    Render (index, text, segment_type, wav_file) jobs to WAV.  Workers finish
+    segments in any order; the result is always [(wav_file, segment_type)] in
+    document order, identical to what the serial path produces.  on_done(job)
+    is called in this process as soon as each job's WAV is complete; if a
+    pooled job fails, the others still finish and are reported before its error
+    is raised.  pool reuses an existing ProcessPoolExecutor(initializer=_init_synthesis_worker).
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        if engine is None:
+            engine = create_tts_engine()
+            set_voice_to_uk_male(engine)
+        for job in jobs:
+            index, text, segment_type, wav_file = job
+            started = time.perf_counter()
+            render_segment(engine, text, segment_type, wav_file)
+            run_metrics.segment_seconds.append(time.perf_counter() - started)
+            if on_done is not None:
+                on_done(job)
+    else:
+        with (contextlib.nullcontext(pool) if pool is not None else
+              ProcessPoolExecutor(max_workers=workers, initializer=_init_synthesis_worker)) as pool:
+            futures = {pool.submit(_render_segment_in_worker, job): job for job in jobs}
+            # One failed job must not cost the others their checkpoints: every
+            # finished job is reported before the first error is raised.
+            first_error = None
+            for future in as_completed(futures):
+                try:
+                    seconds = future.result()[1]
+                except Exception as e:
+                    first_error = first_error or e
+                    continue
+                run_metrics.segment_seconds.append(seconds)
+                if on_done is not None:
+                    on_done(futures[future])
+            if first_error is not None:
+                raise first_error
+    return [(wav_file, segment_type) for _, _, segment_type, wav_file in jobs]
+
+# ------------------------------------------------------------------
+# 2c.  Content-addressed cache of rendered segments (LRU by mtime)
+# ------------------------------------------------------------------
+# Counts for the current convert_text_to_audio() call, which resets them.
+segment_cache_stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+def segment_cache_key(processed_text, voice_id, rate, volume, engine_name=TTS_ENGINE_NAME,
+                      postprocess=SEGMENT_POSTPROCESS):
+    digest = hashlib.sha256()
+    for part in (engine_name, postprocess, str(voice_id), str(rate), repr(volume), processed_text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def segment_cache_path(key, cache_dir=SEGMENT_CACHE_DIR):
+    return os.path.join(cache_dir, key[:2], key + ".wav")
+
+def segment_cache_lookup(key, cache_dir=SEGMENT_CACHE_DIR):
+    """Return the cached WAV for key (marking it recently used), or None."""
+    path = segment_cache_path(key, cache_dir)
+    if os.path.exists(path):
+        os.utime(path)
+        segment_cache_stats["hits"] += 1
+        return path
+    segment_cache_stats["misses"] += 1
+    return None
+
+def segment_cache_store(key, wav_file, cache_dir=SEGMENT_CACHE_DIR):
+    """Move a freshly rendered WAV into the cache and return its new path."""
+    path = segment_cache_path(key, cache_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.{os.getpid()}.part"
+    shutil.move(wav_file, partial)
+    os.replace(partial, path)
+    return path
+
+def prune_segment_cache(max_bytes, cache_dir=SEGMENT_CACHE_DIR):
+    """Evict least recently used entries until the cache fits in max_bytes."""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            segment_cache_stats["evicted"] += 1
+        except OSError as e:
+            print(f"Error evicting {path} from the segment cache: {e}")
+    return total
+
+def clear_segment_cache(cache_dir=SEGMENT_CACHE_DIR):
+    if os.path.isdir(cache_dir):
+        shutil.rmtree(cache_dir)
+        print(f"Cleared segment cache at {cache_dir}")
+    else:
+        print(f"Segment cache at {cache_dir} is already empty.")
+
+# ------------------------------------------------------------------
+# 2d.  Checkpoints – an append-only manifest of finished segments per job
+# ------------------------------------------------------------------
+CHECKPOINT_MANIFEST = "manifest.jsonl"
+
+def default_work_dir(output_filename):
+    """Where a job keeps its segment WAVs and manifest: next to its output."""
+    return os.path.splitext(os.path.abspath(output_filename))[0] + ".parts"
+
+def load_checkpoint(work_dir):
+    """Return {segment_index: (wav_name, key)} for segments a previous run finished."""
+    finished = {}
+    try:
+        with open(os.path.join(work_dir, CHECKPOINT_MANIFEST), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # torn final line from a crash mid-write
+                finished[entry["index"]] = (entry["file"], entry["key"])
+    except OSError:
+        pass
+    return finished
+
+def record_checkpoint(manifest, index, wav_file, key):
+    """Append one finished segment to an open manifest and make it durable."""
+    manifest.write(json.dumps({"index": index, "file": os.path.basename(wav_file), "key": key}) + "\n")
+    manifest.flush()
+    os.fsync(manifest.fileno())
+
+# ------------------------------------------------------------------
+# 2e.  Streaming assembly – segment frames and silence go straight to disk
+# ------------------------------------------------------------------
+def pause_before_ms(index, segment_type):
+    if index == 0:
+        return 0
+    if segment_type == "heading":
+        return HEADING_START_PAUSE_MS
+    if segment_type in ["list", "quote"]:
+        return LIST_QUOTE_START_PAUSE_MS
+    return 0
+
+def pause_after_ms(segment_type, is_last=False):
+    if is_last:
+        return 0
+    return HEADING_END_PAUSE_MS if segment_type == "heading" else PARAGRAPH_END_PAUSE_MS
+
+def read_audio_format(wav_file):
+    """Return (channels, sample_width, framerate) of a WAV file."""
+    with wave.open(wav_file, 'rb') as wav_in:
+        return wav_in.getnchannels(), wav_in.getsampwidth(), wav_in.getframerate()
+
+def iter_silence(duration_ms, audio_format, chunk_frames=ASSEMBLY_CHUNK_FRAMES):
+    channels, sample_width, framerate = audio_format
+    # 8-bit WAV is unsigned, so its silence level is 0x80 rather than 0.
+    frame = (b"\x80" if sample_width == 1 else b"\x00" * sample_width) * channels
+    remaining = int(round(framerate * duration_ms / 1000.0))
+    while remaining > 0:
+        frames = min(remaining, chunk_frames)
+        yield frame * frames
+        remaining -= frames
+
+def iter_wav_frames(wav_file, audio_format, chunk_frames=ASSEMBLY_CHUNK_FRAMES):
+    """Yield the PCM frames of wav_file in audio_format, chunk_frames at a time."""
+    with wave.open(wav_file, 'rb') as wav_in:
+        if (wav_in.getnchannels(), wav_in.getsampwidth(), wav_in.getframerate()) == audio_format:
+            while True:
+                data = wav_in.readframes(chunk_frames)
+                if not data:
+                    break
+                yield data
+            return
+    # Rare: a segment came back in a different format.  Convert just this one.
+    channels, sample_width, framerate = audio_format
+    audio = load_pydub().from_wav(wav_file)
+    yield audio.set_frame_rate(framerate).set_channels(channels).set_sample_width(sample_width).raw_data
+
+def iter_assembled_pcm(temp_wav_files, audio_format, chunk_frames=ASSEMBLY_CHUNK_FRAMES, start=0, stop=None):
+    """
+    Yield the whole book as raw PCM chunks: every (wav_file, Chunk) in document
+    order with the pauses its Chunk carries.  Only one PCM chunk is ever held in
+    memory.  start/stop select a slice with exactly the pauses it has in the book.
+    """
+    for wav_file, chunk in temp_wav_files[start:stop]:
+        yield from iter_silence(chunk.pause_before_ms, audio_format, chunk_frames)
+        yield from iter_wav_frames(wav_file, audio_format, chunk_frames)
+        yield from iter_silence(chunk.pause_after_ms, audio_format, chunk_frames)
+
+def assemble_wav(temp_wav_files, output_wav, meter=None):
+    """
+    Stream the segments and pauses into output_wav using constant memory.
+    If a LoudnessMeter is given, every chunk is measured on the way through.
+    """
+    audio_format = read_audio_format(temp_wav_files[0][0])
+    channels, sample_width, framerate = audio_format
+    with wave.open(output_wav, 'wb') as wav_out:
+        wav_out.setnchannels(channels)
+        wav_out.setsampwidth(sample_width)
+        wav_out.setframerate(framerate)
+        for chunk in iter_assembled_pcm(temp_wav_files, audio_format):
+            wav_out.writeframesraw(chunk)
+            if meter is not None:
+                meter.add(chunk)
+    return output_wav
+
+# FFmpeg raw PCM demuxer for each WAV sample width.
+PCM_FORMATS = {1: "u8", 2: "s16le", 3: "s24le", 4: "s32le"}
+
+AAC_CODEC_ARGS = ["-c:a", "aac", "-b:a", "192k"]
+MP3_CODEC_ARGS = ["-c:a", "libmp3lame", "-b:a", "192k"]
+
+def encode_pcm_stream(pcm_chunks, audio_format, output_filename, audio_filter=None, codec_args=AAC_CODEC_ARGS):
+    """
+    Pipe raw PCM chunks into FFmpeg's stdin and encode them to output_filename,
+    so encoding overlaps assembly and no intermediate WAV is written.  Raises
+    subprocess.CalledProcessError if FFmpeg fails, like subprocess.run(check=True).
+    """
+    channels, sample_width, framerate = audio_format
+    cmd = [require_ffmpeg(), "-y",
+           "-f", PCM_FORMATS[sample_width], "-ar", str(framerate), "-ac", str(channels), "-i", "pipe:0"]
+    if audio_filter:
+        cmd += ["-af", audio_filter]
+    cmd += codec_args + [output_filename]
+    # stderr goes to a file: a full stderr pipe would stall FFmpeg while we write stdin.
+    with tempfile.TemporaryFile() as stderr_log:
+        process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_log)
+        try:
+            for chunk in pcm_chunks:
+                process.stdin.write(chunk)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass  # FFmpeg exited early; its return code below says why.
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        returncode = process.wait()
+        if returncode != 0:
+            stderr_log.seek(0)
+            raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr_log.read())
+    return output_filename
+
+# ------------------------------------------------------------------
+# 2f.  In-process loudness measurement (ITU-R BS.1770 / EBU R128)
+# ------------------------------------------------------------------
+def pcm_to_float(chunk, audio_format):
+    """Interleaved PCM bytes -> float64 array of shape (frames, channels) in [-1, 1)."""
+    channels, sample_width, _ = audio_format
+    if sample_width == 1:
+        samples = (np.frombuffer(chunk, dtype=np.uint8).astype(np.float64) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(chunk, dtype='<i2') / 32768.0
+    elif sample_width == 3:
+        raw = np.frombuffer(chunk, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(values >= 1 << 23, values - (1 << 24), values) / float(1 << 23)
+    else:
+        samples = np.frombuffer(chunk, dtype='<i4') / float(1 << 31)
+    return samples.reshape(-1, channels)
+
+def float_to_pcm(samples, sample_width):
+    """Inverse of pcm_to_float: float array in [-1, 1) -> interleaved PCM bytes."""
+    scale = float(1 << (8 * sample_width - 1))
+    values = np.clip(np.round(samples * scale), -scale, scale - 1).astype(np.int32).ravel()
+    if sample_width == 1:
+        return (values + 128).astype(np.uint8).tobytes()
+    if sample_width == 2:
+        return values.astype('<i2').tobytes()
+    if sample_width == 3:
+        return values.astype('<i4').view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    return values.astype('<i4').tobytes()
+
+def _k_weighting_biquads(framerate):
+    """
+    The two BS.1770 pre-filter stages (high shelf, then high pass) for any
+    rate, by bilinear transform; at 48 kHz they are the spec's coefficients.
+    """
+    gain_db, q, fc = 3.999843853973347, 0.7071752369554196, 1681.974450955533
+    k = np.tan(np.pi * fc / framerate)
+    vh = 10 ** (gain_db / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = (
+        [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0],
+    )
+    q, fc = 0.5003270373238773, 38.13547087602444
+    k = np.tan(np.pi * fc / framerate)
+    a0 = 1 + k / q + k * k
+    high_pass = (
+        [1.0, -2.0, 1.0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0],
+    )
+    return shelf, high_pass
+
+@functools.lru_cache(maxsize=4)
+def _k_weighting_impulse_response(framerate, seconds=0.25):
+    """
+    The K-weighting IIR cascade truncated to an FIR.  Both stages settle within
+    a few tens of milliseconds, so 250 ms of response is exact to well below
+    0.01 dB, and an FIR can be applied to whole chunks with FFT convolution.
+    """
+    length = int(framerate * seconds)
+    signal = [0.0] * length
+    signal[0] = 1.0
+    for b, a in _k_weighting_biquads(framerate):
+        b0, b1, b2 = (coefficient / a[0] for coefficient in b)
+        a1, a2 = a[1] / a[0], a[2] / a[0]
+        x1 = x2 = y1 = y2 = 0.0
+        filtered = []
+        for x in signal:
+            y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+            x2, x1, y2, y1 = x1, x, y1, y
+            filtered.append(y)
+        signal = filtered
+    return np.array(signal)
+
+@functools.lru_cache(maxsize=1)
+def _true_peak_polyphase(oversample=4, taps_per_phase=12):
+    """Windowed-sinc interpolator as a (taps, phases) matrix for 4x true-peak search."""
+    length = oversample * taps_per_phase
+    n = np.arange(length) - (length - 1) / 2.0
+    h = np.sinc(n / oversample) * np.kaiser(length, 5.0)
+    # Column p holds the taps that produce output phase p, ordered oldest sample first.
+    return np.stack([h[p::oversample][::-1] for p in range(oversample)], axis=1)
+
+class LoudnessMeter:
+    """
+    Streaming integrated loudness, loudness range and true peak, fed one PCM
+    chunk at a time as the book is assembled.  result() returns the values
+    FFmpeg's loudnorm expects as measured_I/LRA/TP/thresh.
+    """
+
+    def __init__(self, audio_format):
+        self.audio_format = audio_format
+        channels, _, framerate = audio_format
+        self.step = int(round(framerate * 0.1))        # 100 ms gating sub-blocks
+        self.fir = _k_weighting_impulse_response(framerate)
+        self.fir_tail = np.zeros((len(self.fir) - 1, channels))
+        self.fft_cache = {}
+        self.energy_pending = np.zeros(0)
+        self.sub_blocks = []
+        self.polyphase = _true_peak_polyphase()
+        self.peak_history = np.zeros((self.polyphase.shape[0] - 1, channels))
+        self.true_peak = 0.0
+
+    def _k_weight(self, samples):
+        frames = len(samples)
+        size = 1 << int(np.ceil(np.log2(frames + len(self.fir) - 1)))
+        if size not in self.fft_cache:
+            self.fft_cache = {size: np.fft.rfft(self.fir, size)}
+        spectrum = np.fft.rfft(samples, size, axis=0) * self.fft_cache[size][:, None]
+        filtered = np.fft.irfft(spectrum, size, axis=0)[:frames + len(self.fir) - 1]
+        filtered[:len(self.fir_tail)] += self.fir_tail
+        self.fir_tail = filtered[frames:].copy()
+        return filtered[:frames]
+
+    def _update_true_peak(self, samples):
+        history = np.concatenate([self.peak_history, samples])
+        self.peak_history = history[-len(self.peak_history):]
+        windows = np.lib.stride_tricks.sliding_window_view(history, self.polyphase.shape[0], axis=0)
+        for channel in range(samples.shape[1]):
+            interpolated = windows[:, channel, :] @ self.polyphase
+            self.true_peak = max(self.true_peak, float(np.abs(interpolated).max(initial=0.0)))
+        self.true_peak = max(self.true_peak, float(np.abs(samples).max(initial=0.0)))
+
+    def add(self, chunk):
+        samples = pcm_to_float(chunk, self.audio_format)
+        if not len(samples):
+            return
+        self._update_true_peak(samples)
+        energy = np.concatenate([self.energy_pending, (self._k_weight(samples) ** 2).sum(axis=1)])
+        complete = len(energy) // self.step * self.step
+        if complete:
+            self.sub_blocks.append(energy[:complete].reshape(-1, self.step).mean(axis=1))
+        self.energy_pending = energy[complete:]
+
+    @staticmethod
+    def _loudness(power):
+        return -0.691 + 10 * np.log10(np.maximum(power, 1e-20))
+
+    def _gated_blocks(self, sub_blocks, blocks):
+        if len(sub_blocks) < blocks:
+            return np.zeros(0)
+        return np.convolve(sub_blocks, np.ones(blocks) / blocks, mode='valid')
+
+    def result(self):
+        sub_blocks = np.concatenate(self.sub_blocks) if self.sub_blocks else np.zeros(0)
+
+        # Integrated loudness: 400 ms blocks, absolute gate -70 LUFS, relative gate -10 LU.
+        power = self._gated_blocks(sub_blocks, 4)
+        power = power[self._loudness(power) > -70]
+        if not len(power):
+            return None
+        threshold = self._loudness(power.mean()) - 10
+        integrated = self._loudness(power[self._loudness(power) > threshold].mean())
+
+        # Loudness range: 3 s blocks, absolute gate -70 LUFS, relative gate -20 LU, 10th-95th percentile.
+        short_term = self._gated_blocks(sub_blocks, 30)
+        short_term = short_term[self._loudness(short_term) > -70]
+        loudness_range = 0.0
+        if len(short_term):
+            short_term = short_term[self._loudness(short_term) > self._loudness(short_term.mean()) - 20]
+            if len(short_term):
+                low, high = np.percentile(self._loudness(short_term), [10, 95])
+                loudness_range = high - low
+
+        return {
+            "input_i": float(integrated),
+            "input_lra": float(loudness_range),
+            "input_tp": float(20 * np.log10(max(self.true_peak, 1e-10))),
+            "input_thresh": float(threshold),
+        }
+
+def loudnorm_filter(measured=None):
+    """FFmpeg loudnorm filter: dynamic single pass, or linear with measured input stats."""
+    loudnorm = f"loudnorm=I={LOUDNORM_I}:LRA={LOUDNORM_LRA}:TP={LOUDNORM_TP}"
+    if measured is None:
+        return loudnorm
+    clamp = lambda value, low, high: min(max(value, low), high)
+    return (f"{loudnorm}"
+            f":measured_I={clamp(measured['input_i'], -99, 0):.2f}"
+            f":measured_LRA={clamp(measured['input_lra'], 0, 99):.2f}"
+            f":measured_TP={clamp(measured['input_tp'], -99, 99):.2f}"
+            f":measured_thresh={clamp(measured['input_thresh'], -99, 0):.2f}"
+            f":offset=0:linear=true")
+
+# ------------------------------------------------------------------
+# 2g.  Segment post-processing – trim edge silence, unify the format
+# ------------------------------------------------------------------
+def _anti_alias(samples, source_rate, framerate, attenuation_db=80.0):
+    """
+    Low-pass samples (frames x channels) below framerate's Nyquist frequency
+    with a Kaiser-windowed sinc, so decimating to framerate does not alias.
+    """
+    cutoff = 0.45 * framerate / source_rate          # cycles/sample; 0.5 is source Nyquist
+    transition = 2 * np.pi * 0.05 * framerate / source_rate
+    taps = int(np.ceil((attenuation_db - 8) / (2.285 * transition))) | 1
+    beta = 0.1102 * (attenuation_db - 8.7)
+    n = np.arange(taps) - (taps - 1) / 2.0
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(taps, beta)
+    kernel /= kernel.sum()
+    return np.column_stack([np.convolve(samples[:, c], kernel, mode="same")
+                            for c in range(samples.shape[1])])
+
+def postprocess_segment(wav_file, threshold_dbfs=TRIM_SILENCE_DBFS, pad_ms=TRIM_PAD_MS,
+                        audio_format=SEGMENT_AUDIO_FORMAT):
+    """
+    Rewrite wav_file in place: leading and trailing audio below threshold_dbfs
+    is cut (pad_ms of it is kept), then channels are mixed and the rate is
+    resampled to audio_format: linear interpolation, low-passed first when
+    downsampling.  Needs NumPy.
+    """
+    with wave.open(wav_file, 'rb') as wav_in:
+        source_format = (wav_in.getnchannels(), wav_in.getsampwidth(), wav_in.getframerate())
+        samples = pcm_to_float(wav_in.readframes(wav_in.getnframes()), source_format)
+    channels, sample_width, framerate = audio_format
+    source_rate = source_format[2]
+
+    loud = np.flatnonzero(np.abs(samples).max(axis=1) > 10 ** (threshold_dbfs / 20.0))
+    if len(loud):
+        pad = int(source_rate * pad_ms / 1000)
+        samples = samples[max(loud[0] - pad, 0):loud[-1] + 1 + pad]
+    else:
+        samples = samples[:0]
+
+    if samples.shape[1] != channels:
+        samples = np.repeat(samples.mean(axis=1, keepdims=True), channels, axis=1)
+    if source_rate != framerate and len(samples):
+        if framerate < source_rate:
+            samples = _anti_alias(samples, source_rate, framerate)
+        positions = np.arange(int(round(len(samples) * framerate / float(source_rate)))) * (source_rate / float(framerate))
+        samples = np.column_stack([np.interp(positions, np.arange(len(samples)), samples[:, c])
+                                   for c in range(channels)])
+
+    with wave.open(wav_file, 'wb') as wav_out:
+        wav_out.setnchannels(channels)
+        wav_out.setsampwidth(sample_width)
+        wav_out.setframerate(framerate)
+        wav_out.writeframes(float_to_pcm(samples, sample_width))
+    return wav_file
+
+# ------------------------------------------------------------------
+# 2h.  Unit encoding – fixed-gain AAC units joined by stream copy
+# ------------------------------------------------------------------
+def wav_duration_seconds(wav_file):
+    with wave.open(wav_file, 'rb') as wav_in:
+        return wav_in.getnframes() / float(wav_in.getframerate())
+
+def assembled_duration_seconds(temp_wav_files):
+    """Length of the assembled book: every chunk plus its pauses."""
+    return sum(wav_duration_seconds(wav_file) + (chunk.pause_before_ms + chunk.pause_after_ms) / 1000.0
+               for wav_file, chunk in temp_wav_files)
+
+def plan_units(temp_wav_files, min_seconds=UNIT_MIN_SECONDS, max_seconds=UNIT_MAX_SECONDS):
+    """
+    Split chunk positions into [start, stop) units.  A unit ends before a
+    heading once it holds min_seconds of audio, and always at max_seconds.
+    """
+    units = []
+    start, seconds = 0, 0.0
+    for i, (wav_file, chunk) in enumerate(temp_wav_files):
+        starts_heading = chunk.segment_type == "heading" and temp_wav_files[i - 1][1].source != chunk.source
+        if i > start and ((starts_heading and seconds >= min_seconds) or seconds >= max_seconds):
+            units.append((start, i))
+            start, seconds = i, 0.0
+        seconds += wav_duration_seconds(wav_file) + (chunk.pause_before_ms + chunk.pause_after_ms) / 1000.0
+    units.append((start, len(temp_wav_files)))
+    return units
+
+def unit_gain_db(measured):
+    """
+    One gain for every unit: brings the book to LOUDNORM_I without pushing its
+    true peak over LOUDNORM_TP.  Rounded to UNIT_GAIN_STEP_DB so that a small
+    edit does not change it and invalidate every unit.
+    """
+    if measured is None:
+        return 0.0
+    gain = min(LOUDNORM_I - measured["input_i"], LOUDNORM_TP - measured["input_tp"])
+    return round(gain / UNIT_GAIN_STEP_DB) * UNIT_GAIN_STEP_DB
+
+def unit_key(temp_wav_files, segment_keys, start, stop, gain_db, audio_format):
+    """Hash of everything that ends up in a unit: chunk content, pauses, gain and encoder settings."""
+    pauses = [(chunk.pause_before_ms, chunk.pause_after_ms) for _, chunk in temp_wav_files[start:stop]]
+    description = json.dumps([segment_keys[start:stop], pauses, gain_db, list(audio_format), AAC_CODEC_ARGS])
+    return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+def encode_units(temp_wav_files, segment_keys, audio_format, output_filename, gain_db=0.0,
+                 workers=UNIT_ENCODE_WORKERS):
+    """
+    Encode each unit that is not already in <output>.units/ (in parallel; the
+    work happens in the FFmpeg processes), then concatenate all units into
+    output_filename without re-encoding.  Units no longer used are removed.
+    """
+    units_dir = os.path.splitext(os.path.abspath(output_filename))[0] + ".units"
+    os.makedirs(units_dir, exist_ok=True)
+    unit_files, pending = [], []
+    for start, stop in plan_units(temp_wav_files):
+        unit_file = os.path.join(units_dir,
+                                 unit_key(temp_wav_files, segment_keys, start, stop, gain_db, audio_format) + ".m4a")
+        unit_files.append(unit_file)
+        if not os.path.exists(unit_file):
+            pending.append((start, stop, unit_file))
+    print(f"Encoding {len(pending)} of {len(unit_files)} units at {gain_db:+.1f} dB "
+          f"({len(unit_files) - len(pending)} unchanged)...")
+
+    def encode_unit(start, stop, unit_file):
+        partial = unit_file[:-len(".m4a")] + ".part.m4a"
+        encode_pcm_stream(iter_assembled_pcm(temp_wav_files, audio_format, start=start, stop=stop),
+                          audio_format, partial, f"volume={gain_db}dB")
+        os.replace(partial, unit_file)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for future in [pool.submit(encode_unit, *job) for job in pending]:
+            future.result()
+
+    in_use = set(unit_files)
+    for name in os.listdir(units_dir):
+        path = os.path.join(units_dir, name)
+        if path not in in_use:
+            os.remove(path)
+
+    list_file = os.path.join(units_dir, "concat.txt")
+    with open(list_file, 'w', encoding='utf-8') as f:
+        for unit_file in unit_files:
+            f.write("file '" + unit_file.replace("'", "'\\''") + "'\n")
+    subprocess.run([require_ffmpeg(), "-y", "-f", "concat", "-safe", "0", "-i", list_file, "-c", "copy", output_filename],
+                   check=True, capture_output=True)
+    return output_filename
+
+# ------------------------------------------------------------------
+# 3.  convert_text_to_audio() – plan, synthesize, measure and encode a book
 # ------------------------------------------------------------------
-def convert_text_to_audio(text_segments, output_filename="output_audio.m4a"):
+def convert_text_to_audio(text_segments, output_filename="output_audio.m4a", workers=SYNTHESIS_WORKERS,
+                          cache_dir=SEGMENT_CACHE_DIR, lexicon=None, loudnorm_mode=LOUDNORM_MODE, work_dir=None,
+                          output_mode=OUTPUT_MODE, engine=None, pool=None, chunk_chars=CHUNK_TARGET_CHARS):
     """
-    Same as before, but after stitching the WAV segments we run an FFmpeg loudnorm
-    pass and produce a normalized M4A (AAC 192 kbps).  Falls back to MP3 if FFmpeg
-    fails.
+    Render (text, segment_type) segments to one audio file: the synthesized chunks
+    are stitched and piped straight through an FFmpeg loudnorm pass to produce a
+    normalized M4A (AAC 192 kbps).  Falls back to MP3 if FFmpeg fails.  With workers > 1 the segments are synthesized by a process pool, and
+    segments already in the cache at cache_dir (None disables it) are not
+    synthesized at all.  lexicon is a compiled get_lexicon() result.
+    loudnorm_mode "two-pass" measures loudness over the streamed segments first
+    so the encode can use linear normalization.  output_mode "units" encodes
+    with encode_units() instead of one loudnorm pass.  Segment WAVs and a checkpoint
+    manifest go to work_dir (default: default_work_dir(output_filename)); a
+    rerun after a failure only synthesizes the segments that are missing.
+    engine and pool let a long-running caller reuse a warm engine (its voice
+    already chosen) and synthesis pool.  Segments are rendered as plan_chunks()
+    chunks of at most chunk_chars.
+    Returns the path of the audio file written, or None on failure.
     """
     if not text_segments:
         print("No text to convert to audio.")
-        return
+        return None
 
     try:
-        engine = pyttsx3.init()
-        set_voice_to_uk_male(engine)
+        # Batch and daemon processes convert many documents; report each one's own counts.
+        segment_cache_stats.update(dict.fromkeys(segment_cache_stats, 0))
+        lexicon = lexicon or get_lexicon()
+        if engine is None:
+            engine = create_tts_engine()
+            set_voice_to_uk_male(engine)
+        voice_id = engine.getProperty('voice')
 
-        heading_start_pause_ms   = 500
-        heading_end_pause_ms     = 2000
-        paragraph_end_pause_ms   = 1500
-        list_quote_start_pause_ms = 750
-        heading_start_pause_audio   = AudioSegment.silent(duration=heading_start_pause_ms)
-        heading_end_pause_audio     = AudioSegment.silent(duration=heading_end_pause_ms)
-        paragraph_end_pause_audio   = AudioSegment.silent(duration=paragraph_end_pause_ms)
-        list_quote_start_pause_audio = AudioSegment.silent(duration=list_quote_start_pause_ms)
+        work_dir = work_dir or default_work_dir(output_filename)
+        os.makedirs(work_dir, exist_ok=True)
+        finished = load_checkpoint(work_dir)
 
         temp_wav_files = []
-        for i, (text, segment_type) in enumerate(text_segments):
-            if text.strip():
-                processed_text = preprocess_text_for_tts(text)
-                engine.setProperty('rate', 150 if segment_type == "heading" else 170)
-                engine.setProperty('volume', 1.0)
-                temp_wav_file = f"temp_segment_{i}.wav"
-                engine.save_to_file(processed_text, temp_wav_file)
-                engine.runAndWait()
-                temp_wav_files.append((temp_wav_file, segment_type))
-
-        combined_audio = AudioSegment.empty()
-        for i, (wav_file, segment_type) in enumerate(temp_wav_files):
-            if i > 0:
-                if segment_type == "heading":
-                    combined_audio += heading_start_pause_audio
-                elif segment_type in ["list", "quote"]:
-                    combined_audio += list_quote_start_pause_audio
-            audio = AudioSegment.from_wav(wav_file)
-            combined_audio += audio
-            if i < len(temp_wav_files) - 1:
-                pause_audio = heading_end_pause_audio if segment_type == "heading" else paragraph_end_pause_audio
-                combined_audio += pause_audio
+        segment_keys = []
+        jobs = []
+        job_keys = {}
+        cache_keys = {}
+        resumed = 0
+        source_characters = 0
+
+        def preprocessed_segments():
+            nonlocal source_characters
+            for text, segment_type in text_segments:
+                source_characters += len(text)
+                yield (preprocess_text_for_tts(text, lexicon) if text.strip() else "", segment_type)
+
+        # Lazy end to end: a TXT or DOCX reader is consumed here, one paragraph
+        # at a time, and only the planned chunks are kept.
+        with run_metrics.stage("preprocess") as stage:
+            for i, chunk in enumerate(plan_chunks(preprocessed_segments(), chunk_chars)):
+                key = segment_cache_key(chunk.text, voice_id, segment_rate(chunk.segment_type), SPEECH_VOLUME)
+                segment_keys.append(key)
+                if cache_dir:
+                    cached_wav = segment_cache_lookup(key, cache_dir)
+                    if cached_wav:
+                        temp_wav_files.append((cached_wav, chunk))
+                        continue
+                    cache_keys[len(temp_wav_files)] = key
+                temp_wav_file = os.path.join(os.path.abspath(work_dir), f"temp_chunk_{i}.wav")
+                temp_wav_files.append((temp_wav_file, chunk))
+                if finished.get(i) == (os.path.basename(temp_wav_file), key) and os.path.exists(temp_wav_file):
+                    resumed += 1
+                    continue
+                jobs.append((i, chunk.text, chunk.segment_type, temp_wav_file))
+                job_keys[i] = key
+            stage["characters"] = source_characters
+
+        if resumed:
+            print(f"Resuming: {resumed} chunks already rendered in {work_dir}, {len(jobs)} to go.")
+        if len(temp_wav_files) > len({chunk.source for _, chunk in temp_wav_files}):
+            print(f"Rendering {len(temp_wav_files)} chunks of at most {chunk_chars} characters.")
+        if workers > 1 and len(jobs) > 1:
+            print(f"Synthesizing {len(jobs)} chunks with {workers} worker processes...")
+        with run_metrics.stage("synthesis", characters=sum(len(job[1]) for job in jobs)) as stage:
+            with open(os.path.join(work_dir, CHECKPOINT_MANIFEST), 'a', encoding='utf-8') as manifest:
+                synthesize_segments(jobs, workers, engine, pool=pool,
+                                    on_done=lambda job: record_checkpoint(manifest, job[0], job[3], job_keys[job[0]]))
+            stage["audio_seconds"] = sum(wav_duration_seconds(job[3]) for job in jobs)
+
+        if cache_dir:
+            print(f"Segment cache: {segment_cache_stats['hits']} hits, {segment_cache_stats['misses']} misses")
+
+        if not temp_wav_files:
+            print("No text to convert to audio.")
+            return None
 
         # ------------------------------------------------------------------
-        # 3a.  Export raw concatenated WAV (temporary)
+        # 3a.  Two-pass and unit modes: measure loudness over the streamed segments
         # ------------------------------------------------------------------
-        raw_concat = "temp_concat.wav"
-        combined_audio.export(raw_concat, format="wav")
+        audio_format = read_audio_format(temp_wav_files[0][0])
+        book_seconds = assembled_duration_seconds(temp_wav_files)
+        book_characters = source_characters
+        measured = None
+        if loudnorm_mode == "two-pass" or output_mode == "units":
+            if numpy_available:
+                with run_metrics.stage("measure", audio_seconds=book_seconds):
+                    meter = LoudnessMeter(audio_format)
+                    for chunk in iter_assembled_pcm(temp_wav_files, audio_format):
+                        meter.add(chunk)
+                    measured = meter.result()
+            elif output_mode == "units":
+                print("NumPy is not installed; units are encoded without loudness normalization.")
+            else:
+                print("NumPy is not installed; using single-pass loudnorm.")
+        if measured is not None:
+            print(f"Measured loudness: {measured['input_i']:.1f} LUFS, LRA {measured['input_lra']:.1f} LU, "
+                  f"true peak {measured['input_tp']:.1f} dBTP")
 
         # ------------------------------------------------------------------
-        # 3b.  Loudnorm pass via FFmpeg
+        # 3b.  Stream the assembled PCM through FFmpeg loudnorm into the encoder
+        #      (linear when the input was measured), or encode/reuse units
         # ------------------------------------------------------------------
-        loudnorm_cmd = [
-            ffmpeg_exe, "-y",
-            "-i", raw_concat,
-            "-af", "loudnorm=I=-16:LRA=11:TP=-1.5",
-            "-c:a", "aac", "-b:a", "192k",
-            output_filename
-        ]
-        try:
-            subprocess.run(loudnorm_cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            print(f"Successfully created normalized audio file: {output_filename}")
-        except subprocess.CalledProcessError as e:
-            print("FFmpeg loudnorm failed; falling back to direct MP3 export.")
-            fallback_name = output_filename.replace(".m4a", "_pyttsx3.mp3")
-            combined_audio.export(fallback_name, format="mp3", bitrate="192k")
-            print(f"Fallback audio file created: {fallback_name}")
+        # Assembly, loudnorm and encoding run as one stream, so they are one stage.
+        with run_metrics.stage("encode", characters=book_characters, audio_seconds=book_seconds):
+            try:
+                if output_mode == "units":
+                    encode_units(temp_wav_files, segment_keys, audio_format, output_filename, unit_gain_db(measured))
+                else:
+                    encode_pcm_stream(iter_assembled_pcm(temp_wav_files, audio_format), audio_format,
+                                      output_filename, loudnorm_filter(measured))
+                written_file = output_filename
+                if output_mode == "units" and measured is None:
+                    print(f"Successfully created audio file (not normalized): {output_filename}")
+                else:
+                    print(f"Successfully created normalized audio file: {output_filename}")
+            except subprocess.CalledProcessError:
+                print("FFmpeg loudnorm failed; falling back to direct MP3 export.")
+                fallback_name = output_filename.replace(".m4a", "_pyttsx3.mp3")
+                encode_pcm_stream(iter_assembled_pcm(temp_wav_files, audio_format), audio_format,
+                                  fallback_name, codec_args=MP3_CODEC_ARGS)
+                written_file = fallback_name
+                print(f"Fallback audio file created: {fallback_name}")
 
         # ------------------------------------------------------------------
-        # 3c.  Clean-up
+        # 3c.  Clean-up – only once the encode succeeded, so a failed run
+        #      leaves its rendered segments and manifest in work_dir to resume
         # ------------------------------------------------------------------
-        for wav_file, _ in temp_wav_files:
+        with run_metrics.stage("cleanup"):
+            scratch_files = [wav_file for wav_file, _ in temp_wav_files]
+            if cache_dir:
+                for position, key in cache_keys.items():
+                    segment_cache_store(key, temp_wav_files[position][0], cache_dir)
+                scratch_files = []
+            for wav_file in scratch_files:
+                try:
+                    os.remove(wav_file)
+                except Exception as e:
+                    print(f"Error cleaning up {wav_file}: {e}")
             try:
-                os.remove(wav_file)
-            except Exception as e:
-                print(f"Error cleaning up {wav_file}: {e}")
-        try:
-            os.remove(raw_concat)
-        except Exception as e:
-            print(f"Error cleaning up {raw_concat}: {e}")
+                os.remove(os.path.join(work_dir, CHECKPOINT_MANIFEST))
+                os.rmdir(work_dir)
+            except OSError:
+                pass
+            if cache_dir:
+                prune_segment_cache(SEGMENT_CACHE_MAX_MB * 1024 * 1024, cache_dir)
+        return written_file
 
     except Exception as e:
         print(f"An error occurred during audio conversion: {e}")
-        sys.exit(1)
+        if work_dir and os.path.exists(os.path.join(work_dir, CHECKPOINT_MANIFEST)):
+            kept_in = f"{work_dir} and the segment cache" if segment_cache_stats["hits"] else work_dir
+            print(f"Segments rendered so far are kept in {kept_in}; run the same conversion again to resume.")
+        return None
+
+def convert_document(file_path, output_filename, workers=SYNTHESIS_WORKERS, cache_dir=SEGMENT_CACHE_DIR,
+                     lexicon_file=LEXICON_FILE, loudnorm_mode=LOUDNORM_MODE, pdf_backend=PDF_BACKEND,
+                     pdf_workers=PDF_WORKERS, work_dir=None, output_mode=OUTPUT_MODE, engine=None, pool=None,
+                     chunk_chars=CHUNK_TARGET_CHARS, strip_running=STRIP_RUNNING_LINES):
+    """Extract, prepare and convert one document; returns the audio file written or None."""
+    print(f"Extracting text from: {os.path.basename(file_path)}...")
+    with run_metrics.stage("extract") as stage:
+        text_segments = extract_text_from_file(file_path, pdf_backend, pdf_workers, strip_running)
+    if not text_segments:
+        print("No text could be extracted. Audio conversion aborted.")
+        return None
+    if isinstance(text_segments, list):
+        stage["characters"] = sum(len(text) for text, _ in text_segments)
+        print(f"Extracted {len(text_segments)} segments. Converting to audio...")
+    else:
+        # Read paragraph by paragraph inside convert_text_to_audio()'s preprocess stage.
+        print("Converting to audio as the text is read...")
+    return convert_text_to_audio(prepare_segments_for_tts(text_segments), output_filename, workers=workers,
+                                 cache_dir=cache_dir, lexicon=get_lexicon(lexicon_file),
+                                 loudnorm_mode=loudnorm_mode, work_dir=work_dir, output_mode=output_mode,
+                                 engine=engine, pool=pool, chunk_chars=chunk_chars)
+
+# ------------------------------------------------------------------
+# 3d.  Batch mode – many documents, largest first, on a worker pool
+# ------------------------------------------------------------------
+SUPPORTED_EXTENSIONS = (".txt", ".docx", ".doc", ".pdf")
+
+def collect_batch_inputs(patterns):
+    """Expand directories (their supported files) and globs into unique file paths."""
+    found = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))]
+        else:
+            matches = sorted(glob.glob(pattern))
+        for path in matches:
+            path = os.path.abspath(path)
+            if os.path.isfile(path) and path.lower().endswith(SUPPORTED_EXTENSIONS) and path not in found:
+                found.append(path)
+    return found
+
+def batch_output_name(file_path, output_dir):
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(file_path))[0] + ".m4a")
+
+def output_is_up_to_date(file_path, output_filename):
+    """True if the M4A, or its MP3 fallback, is newer than the source document."""
+    source_mtime = os.path.getmtime(file_path)
+    for candidate in (output_filename, output_filename.replace(".m4a", "_pyttsx3.mp3")):
+        if os.path.exists(candidate) and os.path.getmtime(candidate) >= source_mtime:
+            return True
+    return False
+
+# The warm engine (its voice chosen) and synthesis pool of this batch process,
+# reused for every document it converts, as in daemon mode.
+_batch_engine = None
+_batch_pool = None
+
+def _new_batch_pool(workers):
+    if workers > 1:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_synthesis_worker)
+    return None
+
+def _start_batch_engine(workers=1):
+    global _batch_engine, _batch_pool
+    _batch_engine = create_tts_engine()
+    set_voice_to_uk_male(_batch_engine)
+    _batch_pool = _new_batch_pool(workers)
+
+def _stop_batch_engine():
+    global _batch_engine, _batch_pool
+    if _batch_pool is not None:
+        _batch_pool.shutdown()
+    _batch_engine = _batch_pool = None
+
+def _init_batch_worker(workers=1):
+    """Batch pool initializer: no stage profiling, and one engine for all of this worker's documents."""
+    _disable_stage_profiling()
+    _start_batch_engine(workers)
+    # A pool worker joins its child processes before atexit hooks run, so the
+    # synthesis pool is shut down by a multiprocessing finalizer instead, one
+    # that runs ahead of the finalizers closing the pool's own queues.
+    multiprocessing.util.Finalize(None, _stop_batch_engine, exitpriority=100)
+
+def _convert_batch_item(task):
+    global _batch_pool
+    file_path, output_filename, options = task
+    started = time.time()
+    metrics_mark = run_metrics.mark()
+    try:
+        # Each document checkpoints into its own default_work_dir(), so a failed
+        # file resumes where it stopped on the next batch run.
+        written_file = convert_document(file_path, output_filename, engine=_batch_engine, pool=_batch_pool,
+                                        **options)
+        error = None if written_file else "conversion failed, see log"
+    except Exception as e:
+        written_file, error = None, str(e)
+    if error and _batch_pool is not None:
+        _batch_pool.shutdown()  # a crashed worker breaks the pool for every later document
+        _batch_pool = _new_batch_pool(options.get("workers", 1))
+    return {
+        "input": file_path,
+        "output": written_file,
+        "status": "converted" if written_file else "failed",
+        "error": error,
+        "seconds": round(time.time() - started, 2),
+        "metrics": run_metrics.since(metrics_mark),
+    }
+
+def run_batch(patterns, output_dir, jobs=1, force=False, summary_file=None, **options):
+    """
+    Convert every matching document into output_dir with up to jobs documents
+    at a time.  The largest inputs are scheduled first so a big book is not left
+    running alone at the end.  Writes a JSON summary and returns it.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.time()
+    results = []
+    tasks = []
+    seen_outputs = {}
+    for file_path in sorted(collect_batch_inputs(patterns), key=os.path.getsize, reverse=True):
+        output_filename = batch_output_name(file_path, output_dir)
+        if output_filename in seen_outputs:
+            results.append({"input": file_path, "output": None, "status": "failed", "seconds": 0.0,
+                            "error": f"output name collides with {seen_outputs[output_filename]}"})
+            continue
+        seen_outputs[output_filename] = file_path
+        if not force and output_is_up_to_date(file_path, output_filename):
+            results.append({"input": file_path, "output": output_filename, "status": "skipped",
+                            "error": None, "seconds": 0.0})
+            continue
+        tasks.append((file_path, output_filename, options))
+
+    print(f"Batch: {len(tasks)} to convert, {len(results)} skipped, {jobs} concurrent jobs")
+    if jobs <= 1:
+        if tasks:
+            _start_batch_engine(options.get("workers", 1))
+        try:
+            for task in tasks:
+                results.append(_convert_batch_item(task))
+        finally:
+            _stop_batch_engine()
+    elif tasks:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker,
+                                 initargs=(options.get("workers", 1),)) as pool:
+            futures = [pool.submit(_convert_batch_item, task) for task in tasks]
+            for future in as_completed(futures):
+                result = future.result()
+                print(f"[{result['status']}] {os.path.basename(result['input'])} in {result['seconds']}s")
+                run_metrics.merge(result["metrics"])
+                results.append(result)
+    for result in results:
+        if "metrics" in result:
+            result["metrics"] = result["metrics"]["stages"]  # per-segment timings stay in --metrics
+
+    summary = {
+        "output_dir": os.path.abspath(output_dir),
+        "seconds": round(time.time() - started, 2),
+        "converted": sum(1 for result in results if result["status"] == "converted"),
+        "skipped": sum(1 for result in results if result["status"] == "skipped"),
+        "failed": sum(1 for result in results if result["status"] == "failed"),
+        "files": results,
+    }
+    summary_file = summary_file or os.path.join(output_dir, "batch_summary.json")
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2)
+    print(f"Batch finished: {summary['converted']} converted, {summary['skipped']} skipped, "
+          f"{summary['failed']} failed. Summary written to {summary_file}")
+    return summary
+
+# ------------------------------------------------------------------
+# 3e.  Daemon mode – warm engine, bounded job queue, local HTTP API
+# ------------------------------------------------------------------
+class ConversionDaemon:
+    """
+    Owns one warm TTS engine (and synthesis pool, with workers > 1) on a
+    single worker thread – SAPI5 engines must stay on the thread that made
+    them – and converts queued jobs one at a time.
+    """
+
+    def __init__(self, options, queue_size=DAEMON_QUEUE_SIZE, job_history=DAEMON_JOB_HISTORY):
+        self.options = options
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = {}
+        self.finished_ids = deque()
+        self.job_history = job_history
+        self.voices = []
+        self.ready = threading.Event()
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def start(self):
+        threading.Thread(target=self._work, name="pdf2mp3-worker", daemon=True).start()
+
+    def _new_pool(self):
+        workers = self.options.get("workers", 1)
+        if workers > 1:
+            return ProcessPoolExecutor(max_workers=workers, initializer=_init_synthesis_worker)
+        return None
+
+    def _start_engine(self):
+        engine = create_tts_engine()
+        set_voice_to_uk_male(engine)
+        self.voices = voice_catalog(engine)
+        return engine
+
+    def _work(self):
+        # If the engine cannot be created now, each job retries it and fails
+        # with the reason, so the worker never dies and leaves jobs queued.
+        engine = None
+        try:
+            engine = self._start_engine()
+        except Exception as e:
+            print(f"Could not start the TTS engine: {e}")
+        pool = self._new_pool()
+        self.ready.set()
+        while True:
+            job_id = self.queue.get()
+            job = self.jobs[job_id]
+            self._update(job, status="running", started=time.time())
+            try:
+                if engine is None:
+                    engine = self._start_engine()
+                written_file = convert_document(job["input"], job["output"], engine=engine, pool=pool, **self.options)
+                error = None if written_file else "conversion failed, see daemon log"
+            except Exception as e:
+                written_file, error = None, str(e)
+            self._update(job, status="converted" if written_file else "failed", output=written_file or job["output"],
+                         error=error, finished=time.time())
+            if error and pool is not None:
+                pool.shutdown()  # a crashed worker breaks the pool for every later job
+                pool = self._new_pool()
+
+    def _update(self, job, **fields):
+        with self.lock:
+            job.update(fields)
+            if fields.get("finished"):
+                self.finished_ids.append(job["id"])
+                while len(self.finished_ids) > self.job_history:
+                    del self.jobs[self.finished_ids.popleft()]
+
+    def submit(self, request):
+        """Queue a {"input": path, "output": optional path} request; returns (http_status, body)."""
+        if not isinstance(request, dict):
+            return 400, {"error": "body must be a JSON object"}
+        file_path, output_filename = request.get("input"), request.get("output")
+        if not isinstance(file_path, str) or not file_path:
+            return 400, {"error": "'input' must be a file path"}
+        if output_filename is not None and not isinstance(output_filename, str):
+            return 400, {"error": "'output' must be a file path"}
+        file_path = os.path.abspath(file_path)
+        if not os.path.isfile(file_path):
+            return 400, {"error": f"no such file: {file_path}"}
+        if os.path.splitext(file_path)[1].lower() not in SUPPORTED_EXTENSIONS:
+            return 400, {"error": f"unsupported file type: {file_path}"}
+        output_filename = os.path.abspath(output_filename or os.path.splitext(file_path)[0] + ".m4a")
+        if os.path.splitext(output_filename)[1].lower() not in DAEMON_OUTPUT_EXTENSIONS:
+            return 400, {"error": f"output must end in {', '.join(DAEMON_OUTPUT_EXTENSIONS)}: {output_filename}"}
+        if not os.path.isdir(os.path.dirname(output_filename)):
+            return 400, {"error": f"no such directory: {os.path.dirname(output_filename)}"}
+        with self.lock:
+            job = {"id": str(self.next_id), "input": file_path, "output": output_filename, "status": "queued",
+                   "error": None, "submitted": time.time(), "started": None, "finished": None}
+            try:
+                self.queue.put_nowait(job["id"])
+            except queue.Full:
+                return 503, {"error": f"queue is full ({self.queue.maxsize} jobs)"}
+            self.jobs[job["id"]] = job
+            self.next_id += 1
+            return 202, dict(job)
+
+    def status(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return (200, dict(job)) if job else (404, {"error": f"no such job: {job_id}"})
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    daemon = None  # set by serve()
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _local_request(self):
+        """
+        Only local clients may talk to the daemon.  A Host other than our own
+        address means DNS rebinding, and browsers send Origin with every
+        cross-site POST; the command-line client sends none.
+        """
+        port = self.server.server_address[1]
+        allowed = {f"{DAEMON_HOST}:{port}", f"localhost:{port}"}
+        origin = self.headers.get("Origin")
+        if self.headers.get("Host") not in allowed or (origin is not None and origin not in
+                                                       {f"http://{host}" for host in allowed}):
+            self._reply(403, {"error": "requests must come from this machine"})
+            return False
+        return True
+
+    def do_POST(self):
+        if not self._local_request():
+            return
+        if self.path != "/jobs":
+            return self._reply(404, {"error": "not found"})
+        # Cross-site forms can send text/plain without a preflight, but not JSON.
+        if self.headers.get("Content-Type", "").split(";")[0].strip().lower() != "application/json":
+            return self._reply(415, {"error": "Content-Type must be application/json"})
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "body must be JSON"})
+        self._reply(*self.daemon.submit(request))
+
+    def do_GET(self):
+        if not self._local_request():
+            return
+        if self.path == "/voices":
+            self.daemon.ready.wait(30)
+            return self._reply(200, {"voices": self.daemon.voices})
+        if self.path == "/jobs":
+            with self.daemon.lock:
+                return self._reply(200, {"jobs": [dict(job) for job in self.daemon.jobs.values()],
+                                         "queued": self.daemon.queue.qsize()})
+        if self.path.startswith("/jobs/"):
+            return self._reply(*self.daemon.status(self.path[len("/jobs/"):]))
+        self._reply(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        pass  # the conversions print their own progress
+
+def serve(options, port=DAEMON_PORT, queue_size=DAEMON_QUEUE_SIZE):
+    """Run the conversion daemon on DAEMON_HOST:port until interrupted."""
+    daemon = ConversionDaemon(options, queue_size)
+    daemon.start()
+    handler = type("DaemonRequestHandler", (_DaemonRequestHandler,), {"daemon": daemon})
+    server = ThreadingHTTPServer((DAEMON_HOST, port), handler)
+    print(f"Conversion daemon listening on http://{DAEMON_HOST}:{port} (queue size {queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping the conversion daemon.")
+    finally:
+        server.server_close()
+
+def _daemon_request(port, path, body=None):
+    request = urllib.request.Request(f"http://{DAEMON_HOST}:{port}{path}",
+                                     data=None if body is None else json.dumps(body).encode('utf-8'),
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return json.loads(e.read() or b"{}")
+
+def submit_job(file_path, output_filename=None, port=DAEMON_PORT, wait=False):
+    """Send one document to a running daemon; with wait, poll until it finishes.  Returns the job."""
+    job = _daemon_request(port, "/jobs", {"input": os.path.abspath(file_path), "output": output_filename})
+    if "id" not in job:
+        print(f"Daemon rejected the job: {job.get('error')}")
+        return job
+    print(f"Submitted job {job['id']}: {job['input']} -> {job['output']}")
+    while wait and job.get("status") in ("queued", "running"):
+        time.sleep(DAEMON_POLL_SECONDS)
+        job = _daemon_request(port, f"/jobs/{job['id']}")
+    if wait:
+        print(f"Job {job['id']} {job['status']}: {job.get('error') or job['output']}")
+    return job
 
 # ------------------------------------------------------------------
-# 4.  main() – unchanged except extension hint
+# 4.  main() – single file, batch, daemon and client command lines
 # ------------------------------------------------------------------
 def main():
-    engine_temp = pyttsx3.init()
-    voices = engine_temp.getProperty('voices')
-    print("--- Available System Voices ---")
-    for i, voice in enumerate(voices):
-        print(f"{i}: Name: {voice.name}, ID: {voice.id}")
-    print("-----------------------------\n")
-
-    file_path = input("Please enter the full path to a TXT, DOCX, or PDF file: ").strip().strip('"').strip("'")
-    if not os.path.exists(file_path):
-        print(f"Error: The file '{file_path}' does not exist.")
+    parser = argparse.ArgumentParser(description="Convert a TXT, DOCX or PDF file to an audiobook.")
+    parser.add_argument("--workers", type=int, default=SYNTHESIS_WORKERS,
+                        help="number of TTS worker processes (default: %(default)s)")
+    parser.add_argument("--cache-dir", default=SEGMENT_CACHE_DIR,
+                        help="segment audio cache directory (default: %(default)s)")
+    parser.add_argument("--no-cache", action="store_true", help="always synthesize every segment")
+    parser.add_argument("--clear-cache", action="store_true", help="empty the segment cache and exit")
+    parser.add_argument("--pdf-backend", default=PDF_BACKEND,
+                        help="PDF text extractor: pypdf2, pymupdf, pypdfium2, pdfminer or auto (default: %(default)s)")
+    parser.add_argument("--keep-running-lines", action="store_true", default=not STRIP_RUNNING_LINES,
+                        help="keep PDF running headers, footers and page numbers")
+    parser.add_argument("--pdf-workers", type=int, default=PDF_WORKERS,
+                        help="PDF extraction worker processes (default: %(default)s)")
+    parser.add_argument("--loudnorm", choices=["single-pass", "two-pass"], default=LOUDNORM_MODE,
+                        help="loudness normalization mode (default: %(default)s)")
+    parser.add_argument("--output-mode", choices=["stream", "units"], default=OUTPUT_MODE,
+                        help="'units' re-encodes only changed chapters and joins them by stream copy; "
+                             "needs NumPy (default: %(default)s)")
+    parser.add_argument("--chunk-chars", type=int, default=CHUNK_TARGET_CHARS,
+                        help="longest text per TTS call; longer segments are split at sentences "
+                             "(0: no limit, default: %(default)s)")
+    parser.add_argument("--lexicon", default=LEXICON_FILE,
+                        help="extra pronunciation rules, one 'original = replacement' per line")
+    parser.add_argument("--batch", nargs="+", metavar="INPUT",
+                        help="convert these files, globs or directories without prompting")
+    parser.add_argument("--output-dir", default=".", help="batch output directory (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="documents converted concurrently in batch mode (default: %(default)s)")
+    parser.add_argument("--force", action="store_true", help="batch: convert even if the output is up to date")
+    parser.add_argument("--summary", help="batch: JSON summary path (default: OUTPUT_DIR/batch_summary.json)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write per-stage run metrics: JSON for *.json, Prometheus text format otherwise")
+    parser.add_argument("--profile", nargs="?", const=".", metavar="DIR",
+                        help="profile every stage and save cProfile and tracemalloc dumps of the slowest one")
+    parser.add_argument("--refresh-voices", action="store_true",
+                        help="enumerate the installed voices again instead of using the cached list")
+    parser.add_argument("--serve", action="store_true",
+                        help="run a conversion daemon with a warm engine on localhost")
+    parser.add_argument("--submit", metavar="INPUT", help="send a document to a running daemon")
+    parser.add_argument("--output", help="submit: output file (default: next to the input)")
+    parser.add_argument("--wait", action="store_true", help="submit: wait for the job to finish")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT, help="daemon port (default: %(default)s)")
+    parser.add_argument("--queue-size", type=int, default=DAEMON_QUEUE_SIZE,
+                        help="daemon: jobs that may wait in the queue (default: %(default)s)")
+    args = parser.parse_args()
+
+    if args.clear_cache:
+        clear_segment_cache(args.cache_dir)
         return
+    if args.submit:
+        try:
+            job = submit_job(args.submit, args.output, args.port, args.wait)
+        except urllib.error.URLError as e:
+            print(f"Could not reach the conversion daemon on port {args.port}: {e.reason}")
+            sys.exit(1)
+        sys.exit(0 if job.get("status") in ("queued", "running", "converted") else 1)
 
-    print(f"Extracting text from: {os.path.basename(file_path)}...")
-    text_segments = extract_text_from_file(file_path)
-
-    if text_segments:
-        temp_file = "temp.txt"
-        print(f"Saving extracted text to {temp_file}...")
-        saved_file = save_text_to_file(text_segments, temp_file)
-        if saved_file:
-            lowercase_file = create_lowercase_text_file(temp_file, "small_letter_temp.txt")
-            if lowercase_file:
-                print("Lowercase text file created successfully. Converting to audio...")
-                text_to_convert = read_text_from_file(lowercase_file)
-                if text_to_convert:
-                    lowercase_segments = []
-                    lowercase_parts = text_to_convert.split('\n\n')
-                    lowercase_parts = [p.strip() for p in lowercase_parts if p.strip()]
-                    for i, text in enumerate(lowercase_parts):
-                        segment_type = text_segments[i][1] if i < len(text_segments) else "paragraph"
-                        lowercase_segments.append((text, segment_type))
-                    output_name = os.path.splitext(os.path.basename(file_path))[0] + ".m4a"
-                    convert_text_to_audio(lowercase_segments, output_name)
-                    for f in (temp_file, lowercase_file):
-                        try:
-                            os.remove(f)
-                            print(f"Cleaned up temporary file: {f}")
-                        except Exception as e:
-                            print(f"Error cleaning up {f}: {e}")
-                else:
-                    print("Failed to read text from lowercase file. Audio conversion aborted.")
-            else:
-                print("Failed to create lowercase text file. Audio conversion aborted.")
-            if os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except Exception as e:
-                    print(f"Error cleaning up {temp_file}: {e}")
-        else:
-            print("Failed to save text to temporary file. Audio conversion aborted.")
+    if args.output_mode == "units" and not numpy_available:
+        print("--output-mode units needs NumPy to measure loudness: pip install numpy, or use --output-mode stream.")
+        sys.exit(1)
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        print("FFmpeg was not found. Set PDF2MP3_FFMPEG to the ffmpeg executable or its folder,")
+        print(f"install it in {FFMPEG_LEGACY_DIR}, or add it to PATH.")
+        sys.exit(1)
+    print(f"Using FFmpeg from {os.path.dirname(ffmpeg)}")
+    if args.refresh_voices:
+        voice_catalog(refresh=True)
+    cache_dir = None if args.no_cache else args.cache_dir
+    try:
+        get_lexicon(args.lexicon)
+    except OSError as e:
+        print(f"Error loading lexicon {args.lexicon}: {e}")
+        sys.exit(1)
+    options = dict(workers=args.workers, cache_dir=cache_dir, lexicon_file=args.lexicon,
+                   loudnorm_mode=args.loudnorm, pdf_backend=args.pdf_backend, pdf_workers=args.pdf_workers,
+                   output_mode=args.output_mode, chunk_chars=args.chunk_chars,
+                   strip_running=not args.keep_running_lines)
+
+    run_metrics.profile = args.profile is not None
+    try:
+        if args.serve:
+            serve(options, args.port, args.queue_size)
+            return
+        if args.batch:
+            summary = run_batch(args.batch, args.output_dir, jobs=args.jobs, force=args.force,
+                                summary_file=args.summary, **options)
+            sys.exit(1 if summary["failed"] else 0)
+
+        voices = voice_catalog()
+        print("--- Available System Voices ---")
+        for i, voice in enumerate(voices):
+            print(f"{i}: Name: {voice['name']}, ID: {voice['id']}")
+        print("-----------------------------\n")
+
+        file_path = input("Please enter the full path to a TXT, DOCX, or PDF file: ").strip().strip('"').strip("'")
+        if not os.path.exists(file_path):
+            print(f"Error: The file '{file_path}' does not exist.")
+            return
+
+        output_name = os.path.splitext(os.path.basename(file_path))[0] + ".m4a"
+        if convert_document(file_path, output_name, **options) is None:
+            sys.exit(1)
+    finally:
+        if args.metrics:
+            run_metrics.write(args.metrics)
+            print(f"Run metrics written to {args.metrics}")
+        if args.profile is not None:
+            run_metrics.dump_profile(args.profile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -54,7 +54,7 @@ if %errorlevel% neq 0 (
 
 echo.
 echo Installing required Python libraries...
-pip install python-docx PyPDF2 pyttsx3 pydub comtypes pypiwin32 pywin32 audioop-lts
+pip install python-docx PyPDF2 pyttsx3 pydub comtypes pypiwin32 pywin32 audioop-lts numpy
 if %errorlevel% neq 0 (
     echo Failed to install required libraries.
     echo Please make sure you have internet access and that pip is working correctly.
@@ -0,0 +1,21 @@
+"""Shared fixtures: file-to-audio-converter.py imported as a module."""
+import os
+import sys
+import importlib.util
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONVERTER_PATH = os.path.join(REPO_ROOT, "file-to-audio-converter.py")
+
+
+@pytest.fixture(scope="session")
+def converter():
+    """Import file-to-audio-converter.py (its file name is not a valid module name)."""
+    name = "file_to_audio_converter"
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, CONVERTER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
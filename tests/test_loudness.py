@@ -0,0 +1,26 @@
+"""LoudnessMeter against the BS.1770 / EBU Tech 3341 reference values."""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+def sine_pcm(frequency, amplitude, seconds, framerate, channels):
+    t = np.arange(int(seconds * framerate)) / framerate
+    samples = np.round(amplitude * np.sin(2 * np.pi * frequency * t) * 32767).astype("<i2")
+    return np.repeat(samples[:, None], channels, axis=1).tobytes()
+
+
+def test_k_weighting_matches_spec_coefficients_at_48k(converter):
+    shelf, high_pass = converter._k_weighting_biquads(48000)
+    assert np.allclose(shelf[0], [1.53512485958697, -2.69169618940638, 1.19839281085285], atol=1e-12)
+    assert np.allclose(shelf[1], [1.0, -1.69065929318241, 0.73248077421585], atol=1e-12)
+    assert np.allclose(high_pass[0], [1.0, -2.0, 1.0])
+    assert np.allclose(high_pass[1], [1.0, -1.99004745483398, 0.99007225036621], atol=1e-12)
+
+
+@pytest.mark.parametrize("framerate", [48000, 44100, 22050])
+def test_997_hz_reference_tone_reads_minus_23_lufs(converter, framerate):
+    # A 997 Hz sine at -20 dBFS on one channel is -23.0 LUFS by definition.
+    meter = converter.LoudnessMeter((1, 2, framerate))
+    meter.add(sine_pcm(997, 0.1, 10, framerate, 1))
+    assert meter.result()["input_i"] == pytest.approx(-23.0, abs=0.1)
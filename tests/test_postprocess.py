@@ -0,0 +1,41 @@
+"""postprocess_segment: trimming and format conversion of synthesized WAVs."""
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+def write_tone(path, frequency, framerate, seconds=1.0, amplitude=0.5):
+    t = np.arange(int(seconds * framerate)) / framerate
+    samples = np.round(amplitude * np.sin(2 * np.pi * frequency * t) * 32767).astype("<i2")
+    with wave.open(path, "wb") as wav_out:
+        wav_out.setnchannels(1)
+        wav_out.setsampwidth(2)
+        wav_out.setframerate(framerate)
+        wav_out.writeframes(samples.tobytes())
+
+
+def read_rms(path):
+    with wave.open(path, "rb") as wav_in:
+        samples = np.frombuffer(wav_in.readframes(wav_in.getnframes()), dtype="<i2") / 32768.0
+    # Skip the filter's edge transients.
+    samples = samples[len(samples) // 10:-len(samples) // 10]
+    return np.sqrt(np.mean(samples ** 2))
+
+
+def test_downsampling_removes_tones_above_the_new_nyquist(converter, tmp_path):
+    # 15 kHz at 48 kHz would fold back to 7050 Hz at 22050 Hz without a low-pass.
+    wav_file = str(tmp_path / "high.wav")
+    write_tone(wav_file, 15000, 48000)
+    converter.postprocess_segment(wav_file, threshold_dbfs=-90, audio_format=(1, 2, 22050))
+    assert read_rms(wav_file) < 0.5 / np.sqrt(2) * 10 ** (-60 / 20.0)
+
+
+def test_downsampling_keeps_speech_band_tones(converter, tmp_path):
+    wav_file = str(tmp_path / "low.wav")
+    write_tone(wav_file, 1000, 48000)
+    converter.postprocess_segment(wav_file, threshold_dbfs=-90, audio_format=(1, 2, 22050))
+    with wave.open(wav_file, "rb") as wav_in:
+        assert wav_in.getframerate() == 22050
+    assert read_rms(wav_file) == pytest.approx(0.5 / np.sqrt(2), rel=0.01)
@@ -0,0 +1,29 @@
+"""strip_running_lines: running headers and page numbers go, headings stay."""
+
+
+def book(pages):
+    return ["\n".join(lines) for lines in pages]
+
+
+def test_numbered_running_header_and_page_numbers_are_removed(converter):
+    pages = book([f"A Short Book {page + 10}", f"Body text of page {page}.", str(page + 1)]
+                 for page in range(6))
+    cleaned, removed = converter.strip_running_lines(pages)
+    assert cleaned == [f"Body text of page {page}." for page in range(6)]
+    assert len(removed) == 12
+
+
+def test_numbered_section_headings_are_kept(converter):
+    headings = ["Exercise 12", "Exercise 13", "Question 3", "Question 4",
+                "Chapter 2, part 1", "Chapter 2, part 2"]
+    pages = book([heading, f"Prose of section {page}."] for page, heading in enumerate(headings))
+    cleaned, removed = converter.strip_running_lines(pages)
+    assert removed == []
+    assert cleaned == pages
+
+
+def test_recurring_heading_numbers_that_do_not_follow_the_page_are_kept(converter):
+    # One exercise per page, but numbered 1, 3, 5, ...: not a page counter.
+    pages = book([f"Exercise {2 * page + 1}", f"Solve for x{page}."] for page in range(6))
+    cleaned, removed = converter.strip_running_lines(pages)
+    assert removed == []